@@ -0,0 +1,135 @@
+"""Drive api.py in-process against the synthetic databases and time its workloads.
+
+The app is imported with DB_PATH pointing at the benchmark directory and called through
+httpx's ASGI transport, so the numbers cover routing, the query lanes and SQLite but no
+network. The response cache is disabled so every request reaches the database.
+"""
+import os
+import sys
+import time
+import statistics
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PAGE_SIZE = 20
+CURSOR_PAGES = 10
+
+# scraper prefix -> (table, search term matching many rows, term shorter than a trigram,
+# term matching few rows)
+SEARCHES = {
+    "cucchiaio": ("recipes", "pomodoro", "ri", "tonno pollo"),
+    "blog": ("blog_posts", "python", "py", "post-42"),
+    "linkedin": ("linkedin_jobs", "platform", "pl", "Acme"),
+}
+# Matches no row, the worst case for both the index and the LIKE fallback
+MISSING_TERM = "zzzqqq"
+
+
+def load_app(directory: str):
+    """Import api.py serving the databases in directory, once per process"""
+    os.environ["DB_PATH"] = directory
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    # Full scans of the largest tables take longer than the default search limit
+    os.environ["DB_SEARCH_TIMEOUT"] = "0"
+    import api
+    return api.app
+
+
+def summarize(workload: str, table: str, rows: int, samples: List[float], statuses: List[int],
+              **extra: Any) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    result = {
+        "workload": workload,
+        "table": table,
+        "rows": rows,
+        "runs": len(samples),
+        "errors": sum(1 for status in statuses if status != 200),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, params: Optional[Dict[str, Any]] = None):
+    started = time.perf_counter()
+    response = await client.get(url, params=params)
+    return time.perf_counter() - started, response
+
+
+async def repeat_get(client: httpx.AsyncClient, url: str, params: Dict[str, Any], repeat: int):
+    # One warmup request opens the pool connection and loads the metadata
+    await client.get(url, params=params)
+    samples, statuses = [], []
+    for _ in range(repeat):
+        elapsed, response = await timed_get(client, url, params)
+        samples.append(elapsed)
+        statuses.append(response.status_code)
+    return samples, statuses
+
+
+async def cursor_walk(client: httpx.AsyncClient, url: str):
+    """Follow next_cursor from the first page, one sample per page"""
+    samples, statuses = [], []
+    params: Dict[str, Any] = {"page_size": PAGE_SIZE}
+    for _ in range(CURSOR_PAGES):
+        elapsed, response = await timed_get(client, url, params)
+        samples.append(elapsed)
+        statuses.append(response.status_code)
+        next_cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+        if not next_cursor:
+            break
+        params = {"page_size": PAGE_SIZE, "cursor": next_cursor}
+    return samples, statuses
+
+
+async def export(client: httpx.AsyncClient, url: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    exported = 0
+    size = 0
+    async with client.stream("GET", url, params={"format": "ndjson"}) as response:
+        async for line in response.aiter_lines():
+            if line:
+                exported += 1
+                size += len(line) + 1
+        status = response.status_code
+    return {"seconds": time.perf_counter() - started, "exported": exported, "bytes": size, "status": status}
+
+
+async def run_workloads(app, scraper_name: str, prefix: str, rows: int, repeat: int = 20,
+                        export_table: bool = True) -> List[Dict[str, Any]]:
+    table, common_term, short_term, narrow_term = SEARCHES[prefix]
+    url = f"/{scraper_name}/{table}"
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        samples, statuses = await repeat_get(client, url, {"page": 1, "page_size": PAGE_SIZE}, repeat)
+        results.append(summarize("first_page", table, rows, samples, statuses))
+
+        # 90% into the table, what an OFFSET-paginating client pays near the end
+        deep_page = max(1, int(rows * 0.9) // PAGE_SIZE)
+        samples, statuses = await repeat_get(client, url, {"page": deep_page, "page_size": PAGE_SIZE}, repeat)
+        results.append(summarize("deep_offset", table, rows, samples, statuses, page=deep_page))
+
+        samples, statuses = await cursor_walk(client, url)
+        results.append(summarize("cursor_walk", table, rows, samples, statuses))
+
+        for workload, term in (("search", common_term), ("search_narrow", narrow_term), ("search_missing", MISSING_TERM),
+                               ("search_short", short_term)):
+            samples, statuses = await repeat_get(client, url, {"search": term, "page_size": PAGE_SIZE}, repeat)
+            results.append(summarize(workload, table, rows, samples, statuses, term=term))
+
+        if export_table:
+            exported = await export(client, f"{url}/export")
+            results.append(summarize(
+                "export_ndjson", table, rows, [exported["seconds"]], [exported["status"]],
+                exported=exported["exported"], bytes=exported["bytes"],
+                rows_per_second=round(exported["exported"] / exported["seconds"]),
+            ))
+    return results
@@ -0,0 +1,115 @@
+"""Compare the browserless static path against the browser path on saved blog pages.
+
+Serves benchmarks/fixtures/blog on localhost like the real blog (/, /page/2/, ...) and
+deep-crawls it with the blog config's schema. Reports pages/s of:
+  - extraction only: JsonCssExtractionStrategy (BeautifulSoup) vs the lxml evaluator
+  - static path: StaticFetcher (aiohttp + lxml)
+  - browser path: CrawlerWrapper with a local Chromium, skipped when none is installed
+
+Usage: python benchmarks/bench_extraction.py [rounds]
+"""
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "crawlers"))
+
+from crawl4ai import BFSDeepCrawlStrategy, BrowserConfig, CacheMode, CrawlerRunConfig  # noqa: E402
+from crawl4ai import JsonCssExtractionStrategy  # noqa: E402
+from crawl4ai.deep_crawling.filters import FilterChain, URLPatternFilter  # noqa: E402
+from helpers.crawler_wrapper import CrawlerWrapper  # noqa: E402
+from helpers.static_fetcher import LxmlCssExtractionStrategy, StaticFetcher  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "blog"
+SCHEMA = json.loads((Path(__file__).resolve().parent.parent / "crawlers" / "configs" / "blog.json").read_text())["schema"]
+
+
+def load_pages():
+    return {int(path.stem.split("-")[1]): path.read_text() for path in sorted(FIXTURES.glob("page-*.html"))}
+
+
+def bench_extraction(pages, rounds: int):
+    html = list(pages.values())
+    reference = [JsonCssExtractionStrategy(SCHEMA).run("", [page]) for page in html]
+    rates = {}
+    for label, strategy in (("beautifulsoup", JsonCssExtractionStrategy(SCHEMA)), ("lxml", LxmlCssExtractionStrategy(SCHEMA))):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            extracted = [strategy.run("", [page]) for page in html]
+        elapsed = time.perf_counter() - started
+        if extracted != reference:
+            print(f"✗ {label} extracted different items than JsonCssExtractionStrategy")
+        rates[label] = rounds * len(html) / elapsed
+        print(f"extract {label:<14} {rates[label]:10.1f} pages/s")
+    print(f"extraction speedup: {rates['lxml'] / rates['beautifulsoup']:.2f}x")
+
+
+async def serve(pages):
+    async def page(request: web.Request):
+        number = int(request.match_info.get("number", 1))
+        if number not in pages:
+            raise web.HTTPNotFound()
+        return web.Response(text=pages[number], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", page)
+    app.router.add_get("/page/{number}/", page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def crawler_config(base_url: str) -> CrawlerRunConfig:
+    pattern = base_url.replace(".", r"\.")
+    return CrawlerRunConfig(
+        extraction_strategy=JsonCssExtractionStrategy(SCHEMA),
+        deep_crawl_strategy=BFSDeepCrawlStrategy(
+            max_depth=50,
+            max_pages=100,
+            filter_chain=FilterChain([URLPatternFilter(patterns=[rf"^{pattern}/page/\d+/?$", rf"^{pattern}/?$"], use_glob=False)]),
+        ),
+        cache_mode=CacheMode.BYPASS,
+        semaphore_count=5,
+    )
+
+
+async def bench_crawl(label: str, crawler, base_url: str, rounds: int):
+    crawled = items = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        results = await crawler.crawl(f"{base_url}/", crawler_config(base_url))
+        crawled += len(results)
+        items += sum(len(json.loads(result.extracted_content or "[]")) for result in results)
+    elapsed = time.perf_counter() - started
+    print(f"crawl {label:<16} {crawled:>5} pages {items:>6} items {elapsed:8.3f}s {crawled / elapsed:10.1f} pages/s")
+    return crawled / elapsed
+
+
+async def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pages = load_pages()
+    bench_extraction(pages, rounds)
+
+    runner, base_url = await serve(pages)
+    try:
+        async with StaticFetcher() as fetcher:
+            static = await bench_crawl("static", fetcher, base_url, rounds)
+        try:
+            async with CrawlerWrapper(BrowserConfig(headless=True, verbose=False), local=True) as wrapper:
+                browser = await bench_crawl("browser", wrapper, base_url, max(1, rounds // 10))
+            print(f"static path speedup: {static / browser:.1f}x")
+        except Exception as e:
+            print(f"✗ Browser path unavailable, skipped: {str(e).splitlines()[0]}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""Compare DatabaseHelper.save_data throughput against the previous row-by-row loop.
+
+Usage: python benchmarks/bench_save_data.py [rows] [batch_size]
+"""
+import sys
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "crawlers"))
+
+from helpers.db_helper import DatabaseHelper  # noqa: E402
+
+SCHEMA = {
+    "name": "recipes",
+    "primary_key": "url",
+    "fields": [
+        {"name": "url", "type": "text"},
+        {"name": "name", "type": "text"},
+        {"name": "source", "type": "text"},
+    ],
+    "baseFields": [],
+}
+
+
+def make_rows(count: int):
+    return [
+        {
+            "url": f"https://www.cucchiaio.it/ricetta/ricetta-{index}/",
+            "name": f"ricetta {index}",
+            "source": "cucchiaio.it",
+        }
+        for index in range(count)
+    ]
+
+
+def legacy_save_data(db: DatabaseHelper, data):
+    """The original save_data: one execute per row, one commit at the end"""
+    field_names = [field["name"] for field in db.fields]
+    placeholders = ", ".join(["?" for _ in field_names])
+    columns_str = ", ".join(field_names)
+    insert_sql = f"""
+    INSERT OR REPLACE INTO {db.table_name} ({columns_str}, updated_at)
+    VALUES ({placeholders}, CURRENT_TIMESTAMP)
+    """
+    inserted_count = 0
+    for item in data:
+        values = [item.get(field_name) for field_name in field_names]
+        if db.primary_key in field_names and not values[field_names.index(db.primary_key)]:
+            continue
+        try:
+            db.cursor.execute(insert_sql, values)
+            inserted_count += 1
+        except sqlite3.Error as e:
+            print(f"Error inserting data: {e}")
+    db.conn.commit()
+    return inserted_count
+
+
+def upsert_loop_save_data(db: DatabaseHelper, data):
+    """save_data's validation, hashing and upsert, but one execute per row: isolates executemany"""
+    rows, _ = db._validate_rows(data, db.field_names)
+    with db.conn:
+        for values in rows:
+            db.cursor.execute(db.insert_sql, values)
+    return len(rows)
+
+
+def run(label: str, save, rows, resave: bool = False, **kwargs):
+    with tempfile.TemporaryDirectory() as directory:
+        with DatabaseHelper(directory, "bench", SCHEMA) as db:
+            db.create_table_from_schema()
+            if resave:
+                save(db, rows, **kwargs)
+            started = time.perf_counter()
+            saved = save(db, rows, **kwargs)
+            elapsed = time.perf_counter() - started
+    print(f"{label:<24} {saved:>9} rows  {elapsed:8.3f}s  {saved / elapsed:12.0f} rows/s")
+    return saved / elapsed
+
+
+def compare(count: int = 50000, batch_size: int = 500):
+    """Rows per second of both implementations, also used by benchmarks/run.py"""
+    rows = make_rows(count)
+    legacy = run("row-by-row loop", legacy_save_data, rows)
+    upsert_loop = run("row-by-row upsert", upsert_loop_save_data, rows)
+    batched = run(f"executemany ({batch_size})", DatabaseHelper.save_data, rows, batch_size=batch_size)
+    # Saving the same rows again, the old loop rewrites them and the upsert skips them
+    legacy_resave = run("row-by-row loop, resave", legacy_save_data, rows, resave=True)
+    batched_resave = run(f"executemany ({batch_size}), resave", DatabaseHelper.save_data, rows,
+                         resave=True, batch_size=batch_size)
+    print(f"speedup: {batched / legacy:.2f}x (same upsert one row at a time: {batched / upsert_loop:.2f}x, "
+          f"resave: {batched_resave / legacy_resave:.2f}x)")
+    return {
+        "rows": count,
+        "batch_size": batch_size,
+        "legacy_rows_per_second": round(legacy),
+        "upsert_loop_rows_per_second": round(upsert_loop),
+        "batched_rows_per_second": round(batched),
+        "speedup": round(batched / legacy, 2),
+        "upsert_loop_speedup": round(batched / upsert_loop, 2),
+        "resave_speedup": round(batched_resave / legacy_resave, 2),
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    compare(count, batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare two result files written by benchmarks/run.py.
+
+Usage: python benchmarks/compare.py benchmarks/results/<before>.json benchmarks/results/<after>.json
+"""
+import sys
+import json
+from typing import Any, Dict, Tuple
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def index_api(report: Dict[str, Any]) -> Dict[Tuple[str, int, str], Dict[str, Any]]:
+    return {(result["table"], result["rows"], result["workload"]): result for result in report.get("api", [])}
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__.strip())
+        sys.exit(1)
+    before, after = load(sys.argv[1]), load(sys.argv[2])
+    print(f"before: {before['commit'][:12]} {before.get('subject', '')}")
+    print(f"after:  {after['commit'][:12]} {after.get('subject', '')}")
+    print()
+
+    before_api, after_api = index_api(before), index_api(after)
+    print(f"{'table':<15} {'rows':>8} {'workload':<16} {'before p50':>12} {'after p50':>12} {'change':>8}")
+    for key in sorted(before_api.keys() & after_api.keys()):
+        old, new = before_api[key]["p50_ms"], after_api[key]["p50_ms"]
+        change = f"{old / new:.2f}x" if new else "-"
+        print(f"{key[0]:<15} {key[1]:>8} {key[2]:<16} {old:>10.2f}ms {new:>10.2f}ms {change:>8}")
+
+    before_ingest = {(r["table"], r["rows"]): r for r in before.get("ingest", []) if not r["reused"]}
+    after_ingest = {(r["table"], r["rows"]): r for r in after.get("ingest", []) if not r["reused"]}
+    if before_ingest.keys() & after_ingest.keys():
+        print()
+        print(f"{'table':<15} {'rows':>8} {'before rows/s':>14} {'after rows/s':>14} {'change':>8}")
+        for key in sorted(before_ingest.keys() & after_ingest.keys()):
+            old, new = before_ingest[key]["rows_per_second"], after_ingest[key]["rows_per_second"]
+            print(f"{key[0]:<15} {key[1]:>8} {old:>14} {new:>14} {new / old:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
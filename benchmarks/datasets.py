@@ -0,0 +1,130 @@
+"""Synthetic scraper databases shaped like the real ones, built through DatabaseHelper.
+
+Each size gets its own scraper databases (cucchiaio_<rows>, blog_<rows>, linkedin_<rows>)
+so several sizes can live in one directory and be served by one API process.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "crawlers"))
+
+from helpers.db_helper import DatabaseHelper  # noqa: E402
+
+RECIPES = {
+    "name": "recipes",
+    "primary_key": "url",
+    "fields": [
+        {"name": "url", "type": "text"},
+        {"name": "name", "type": "text"},
+        {"name": "source", "type": "text"},
+    ],
+    "baseFields": [],
+}
+
+BLOG_POSTS = {
+    "name": "blog_posts",
+    "baseFields": [{"name": "id", "type": "attribute", "attribute": "id"}],
+    "fields": [
+        {"name": "title", "type": "text"},
+        {"name": "content", "type": "text"},
+    ],
+}
+
+LINKEDIN_JOBS = {
+    "name": "linkedin_jobs",
+    "fields": [
+        {"name": "id", "type": "attribute"},
+        {"name": "title", "type": "text"},
+        {"name": "company", "type": "text"},
+        {"name": "body", "type": "text"},
+    ],
+}
+
+INGREDIENTS = ["pasta", "tonno", "pollo", "zucca", "ricotta", "pomodoro", "basilico", "funghi", "salmone",
+               "zucchine", "melanzane", "limone", "ceci", "riso", "patate", "spinaci", "gamberi", "mandorle"]
+WORDS = ["python", "react", "docker", "sqlite", "crawler", "async", "backend", "frontend", "cloud", "data",
+         "team", "remote", "senior", "engineer", "platform", "api", "search", "index", "queue", "cache",
+         "performance", "latency", "deploy", "review", "design", "product", "customer", "growth"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne"]
+
+
+def recipe_rows(rng: random.Random, start: int, count: int) -> List[Dict[str, Any]]:
+    rows = []
+    for index in range(start, start + count):
+        name = " ".join(rng.sample(INGREDIENTS, 3))
+        rows.append({
+            "url": f"https://www.cucchiaio.it/ricetta/ricetta-{name.replace(' ', '-')}-{index}/",
+            "name": f"ricetta {name} {index}",
+            "source": "cucchiaio.it",
+        })
+    return rows
+
+
+def blog_rows(rng: random.Random, start: int, count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"post-{index}",
+            "title": " ".join(rng.choices(WORDS, k=6)).capitalize(),
+            "content": " ".join(rng.choices(WORDS, k=80)),
+        }
+        for index in range(start, start + count)
+    ]
+
+
+def linkedin_rows(rng: random.Random, start: int, count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": str(4000000000 + index),
+            "title": f"{rng.choice(['Senior', 'Staff', 'Lead', 'Junior'])} {' '.join(rng.choices(WORDS, k=2))} engineer",
+            "company": rng.choice(COMPANIES),
+            "body": " ".join(rng.choices(WORDS, k=250)),
+        }
+        for index in range(start, start + count)
+    ]
+
+
+# scraper prefix -> (schema, row generator)
+DATASETS: Dict[str, Any] = {
+    "cucchiaio": (RECIPES, recipe_rows),
+    "blog": (BLOG_POSTS, blog_rows),
+    "linkedin": (LINKEDIN_JOBS, linkedin_rows),
+}
+
+
+def scraper_name(prefix: str, rows: int) -> str:
+    return f"{prefix}_{rows}"
+
+
+def generate(make_rows: Callable[[random.Random, int, int], List[Dict[str, Any]]], rows: int,
+             chunk_size: int = 10000, seed: int = 42) -> Iterator[List[Dict[str, Any]]]:
+    """Rows in chunks, so a million rows with long bodies never sit in memory at once"""
+    rng = random.Random(seed)
+    for start in range(0, rows, chunk_size):
+        yield make_rows(rng, start, min(chunk_size, rows - start))
+
+
+def build_database(directory: str, prefix: str, rows: int) -> Dict[str, Any]:
+    """Create one synthetic scraper database, returns its ingest timing.
+    An existing database with the expected row count is reused and not timed."""
+    schema, make_rows = DATASETS[prefix]
+    with DatabaseHelper(directory, scraper_name(prefix, rows), schema) as db:
+        db.create_table_from_schema()
+        if db.count() == rows:
+            return {"table": db.table_name, "rows": rows, "reused": True}
+
+        saved = 0
+        started = time.perf_counter()
+        for chunk in generate(make_rows, rows):
+            saved += db.save_data(chunk)
+        elapsed = time.perf_counter() - started
+    return {
+        "table": db.table_name,
+        "rows": saved,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(saved / elapsed),
+        "database_bytes": Path(db.db_path).stat().st_size,
+        "reused": False,
+    }
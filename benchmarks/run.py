@@ -0,0 +1,108 @@
+"""Run the benchmark suite and store the results as JSON, one file per commit.
+
+Builds the synthetic recipes, blog_posts and linkedin_jobs databases for every size
+(timing save_data ingest), drives the API workloads against them and runs the
+save_data comparison. Compare two result files with benchmarks/compare.py.
+
+Usage: python benchmarks/run.py [--sizes 10000,100000,1000000] [--data-dir DIR] [--repeat 20]
+                                [--output benchmarks/results] [--no-export]
+
+Databases in --data-dir are kept and reused by later runs (their ingest is not timed
+again), without it they are built in a temporary directory.
+"""
+import sys
+import json
+import time
+import sqlite3
+import asyncio
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import bench_save_data  # noqa: E402
+from bench_api import load_app, run_workloads  # noqa: E402
+from datasets import DATASETS, build_database, scraper_name  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "HEAD") or "unknown",
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+async def run_suite(directory: str, sizes: List[int], repeat: int, export: bool) -> Dict[str, Any]:
+    ingest = []
+    for rows in sizes:
+        for prefix in DATASETS:
+            print(f"Building {scraper_name(prefix, rows)}...")
+            result = build_database(directory, prefix, rows)
+            ingest.append(result)
+            if not result["reused"]:
+                print(f"  {result['rows']} rows in {result['seconds']}s ({result['rows_per_second']} rows/s)")
+
+    app = load_app(directory)
+    api = []
+    for rows in sizes:
+        for prefix in DATASETS:
+            name = scraper_name(prefix, rows)
+            print(f"Running API workloads on {name}...")
+            for result in await run_workloads(app, name, prefix, rows, repeat=repeat, export_table=export):
+                print(f"  {result['workload']:<16} p50 {result['p50_ms']:>10.2f}ms  p95 {result['p95_ms']:>10.2f}ms"
+                      + (f"  ✗ {result['errors']} errors" if result["errors"] else ""))
+                api.append(result)
+    return {"ingest": ingest, "api": api}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scraper API and ingest benchmarks")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated row counts")
+    parser.add_argument("--data-dir", help="Keep the synthetic databases here and reuse them")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed requests per workload")
+    parser.add_argument("--output", default=str(REPO_ROOT / "benchmarks" / "results"), help="Results directory")
+    parser.add_argument("--no-export", action="store_true", help="Skip the full-table export workload")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    revision = git_revision()
+    started = time.time()
+    if args.data_dir:
+        results = asyncio.run(run_suite(args.data_dir, sizes, args.repeat, not args.no_export))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = asyncio.run(run_suite(directory, sizes, args.repeat, not args.no_export))
+
+    print("Comparing save_data implementations...")
+    results["save_data"] = bench_save_data.compare()
+
+    report = {
+        **revision,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+        "duration_seconds": round(time.time() - started, 1),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "sizes": sizes,
+        "repeat": args.repeat,
+        **results,
+    }
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    path = output / f"{revision['commit'][:12]}{'-dirty' if revision['dirty'] else ''}.json"
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,27 @@
 import os
 import asyncio
 import aiohttp
-import xml.etree.ElementTree as ET
+from typing import Dict, Optional
 from dotenv import load_dotenv
 from helpers.db_helper import DatabaseHelper
+from helpers.metrics import start_exporter
+from helpers.resilience import run_forever
+from helpers.resources import SharedResources
+from helpers.sitemap import SitemapReader
 
 # Load environment variables
 load_dotenv()
 
 db_path = os.getenv("DB_PATH", "")
-scrape_interval = os.getenv("SCRAPE_INTERVAL", "3600")
+scrape_interval = os.getenv("CUCCHIAIO_SCRAPE_INTERVAL", os.getenv("SCRAPE_INTERVAL", "3600"))
+metrics_port = os.getenv("METRICS_PORT", "")  # Serve /metrics on this port when set
 
 if not db_path:
     raise ValueError("Please set DB_PATH environment variable.")
 
 SITEMAP_URL = "https://www.cucchiaio.it/Sitemap-content-RICETTE.xml"
 
-async def extract_recipes():
+async def extract_recipes(resources: SharedResources):
     """Extract recipe URLs from cucchiaio.it sitemap"""
     
     schema = {
@@ -41,90 +46,90 @@ async def extract_recipes():
     
     print(f"Fetching sitemap from {SITEMAP_URL}")
     
-    async with aiohttp.ClientSession() as session:
-        async with session.get(SITEMAP_URL) as response:
-            if response.status != 200:
-                print(f"✗ Failed to fetch sitemap: HTTP {response.status}")
-                return
-            
-            xml_content = await response.text()
-    
-    print("Parsing sitemap XML...")
-    
-    # Parse XML
-    root = ET.fromstring(xml_content)
-    
-    # Define namespace for sitemap
-    namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-    
-    # Extract all URLs
-    recipes = []
+    found_count = 0
     skipped_count = 0
     
-    for url_elem in root.findall('ns:url', namespace):
-        loc = url_elem.find('ns:loc', namespace)
-        if loc is not None and loc.text is not None:
-            # Clean the URL by stripping whitespace
-            url = loc.text.strip()
-            
-            # Only keep actual recipe URLs (with /ricetta/ not /ricette/)
-            if '/ricetta/' not in url:
-                skipped_count += 1
-                continue
+    async with aiohttp.ClientSession() as session:
+        db = resources.database(db_path, "cucchiaio", schema)
+        sitemap = SitemapReader(session, db.conn, retry_policy=resources.retry_policy)
+        # The sync gets its own connection, staging and the merge run in worker threads
+        # so they don't stall the sitemap downloads and the other scrapers on the loop
+        with DatabaseHelper(db_path, "cucchiaio", schema, check_same_thread=False) as sync_db:
+            # Recipes are staged as the sitemap streams in, then merged in one transaction
+            await asyncio.to_thread(sync_db.begin_sync)
+            batch = []
+            async for entry in sitemap.iter_urls(SITEMAP_URL):
+                recipe = recipe_from_url(entry["loc"])
+                if recipe is None:
+                    skipped_count += 1
+                    continue
+                
+                batch.append(recipe)
+                found_count += 1
+                if len(batch) >= sync_db.batch_size:
+                    await asyncio.to_thread(sync_db.stage_sync, batch)
+                    batch = []
+            await asyncio.to_thread(sync_db.stage_sync, batch)
             
-            # Extract recipe name from URL
-            # Example: https://www.cucchiaio.it/ricetta/ricetta-cotto-crudo-tonno/
-            # Should extract: ricetta cotto crudo tonno (with spaces)
-            path_parts = url.rstrip('/').split('/')
-            name = path_parts[-1] if path_parts else ""
+            if sitemap.not_modified:
+                print("Sitemap not modified since last scrape, nothing to do")
+                return
             
-            # Replace hyphens with spaces for cleaner names
-            name = name.replace('-', ' ')
+            print(f"Found {found_count} recipes (skipped {skipped_count} non-recipe URLs)")
             
-            # Skip if name is empty
-            if not name:
-                skipped_count += 1
-                continue
+            # An empty sitemap is almost certainly a broken fetch, don't wipe the table for it
+            if not found_count:
+                print("✗ No recipes found in sitemap, keeping existing recipes")
+                return
             
-            recipes.append({
-                "url": url,
-                "name": name,
-                "source": "cucchiaio.it"
-            })
-    
-    print(f"Found {len(recipes)} recipes (skipped {skipped_count} non-recipe URLs)")
-    
-    # Save to database
-    with DatabaseHelper(db_path, "cucchiaio", schema) as db:
-        db.create_table_from_schema()
-        
-        # Remove all existing cucchiaio recipes before inserting new ones
-        deleted_count = db.delete_by_field("source", "cucchiaio.it")
-        print(f"Deleted {deleted_count} existing recipes")
-        
-        inserted_count = db.save_data(recipes)
-        print(f"Saved {inserted_count} recipes to database at {db.db_path}")
+            # Only write the difference between the sitemap and the stored cucchiaio recipes
+            counts = await asyncio.to_thread(sync_db.finish_sync, scope_field="source", scope_value="cucchiaio.it")
+        sitemap.save_state()
+        print(f"Synced recipes to database at {db.db_path}: "
+              f"{counts['added']} added, {counts['changed']} changed, {counts['removed']} removed")
         
         # Print stats
-        all_data = db.get_all_data()
-        print(f"Total recipes in database: {len(all_data)}")
+        print(f"Total recipes in database: {db.count()}")
+
+
+def recipe_from_url(url: str) -> Optional[Dict[str, str]]:
+    """Build a recipe row from a sitemap URL, None for non-recipe URLs"""
+    # Only keep actual recipe URLs (with /ricetta/ not /ricette/)
+    if '/ricetta/' not in url:
+        return None
+    
+    # Extract recipe name from URL
+    # Example: https://www.cucchiaio.it/ricetta/ricetta-cotto-crudo-tonno/
+    # Should extract: ricetta cotto crudo tonno (with spaces)
+    path_parts = url.rstrip('/').split('/')
+    name = path_parts[-1] if path_parts else ""
+    
+    # Replace hyphens with spaces for cleaner names
+    name = name.replace('-', ' ')
+    
+    # Skip if name is empty
+    if not name:
+        return None
+    
+    return {
+        "url": url,
+        "name": name,
+        "source": "cucchiaio.it"
+    }
+
+async def run(resources: SharedResources):
+    """One scrape, the job the scheduler runs every scrape_interval seconds"""
+    await extract_recipes(resources)
 
 async def main():
     """Main function to run the scraper continuously"""
+    if metrics_port:
+        start_exporter(int(metrics_port))
+    
     print("Starting Cucchiaio recipe scraper...")
     
-    while True:
-        try:
-            await extract_recipes()
-            print(f"\nWaiting {scrape_interval} seconds before next scrape...")
-            await asyncio.sleep(int(scrape_interval))
-        except KeyboardInterrupt:
-            print("\n\nStopping scraper...")
-            break
-        except Exception as e:
-            print(f"Error during scraping: {e}")
-            print(f"Retrying in {scrape_interval} seconds...")
-            await asyncio.sleep(int(scrape_interval))
+    async with SharedResources() as resources:
+        await run_forever(lambda: extract_recipes(resources), int(scrape_interval), "Cucchiaio scraper")
 
 if __name__ == "__main__":
     asyncio.run(main())
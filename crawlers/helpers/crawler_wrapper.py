@@ -1,41 +1,295 @@
-from typing import List, cast, Optional
-from crawl4ai import AsyncWebCrawler, BrowserConfig, Crawl4aiDockerClient, CrawlResult, CrawlerRunConfig
+import time
+import asyncio
+from typing import AsyncIterator, List, Tuple, cast, Optional
+from urllib.parse import urlsplit
+import aiohttp
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CacheMode, Crawl4aiDockerClient, CrawlResult, CrawlerRunConfig
+from crawl4ai import RateLimiter, SemaphoreDispatcher
+from helpers.metrics import counter, histogram
+from helpers.page_cache import CachedPage, PageCache, cache_requests
+from helpers.resilience import CircuitBreaker, RetryPolicy, is_retryable, result_is_retryable, retry_after
+
+crawl_seconds = histogram("crawler_crawl_duration_seconds", "Time to crawl one URL, extraction included", ["host"])
+crawl_results = counter("crawler_results_total", "Crawl results, by outcome", ["host", "outcome"])
+fetched_bytes = counter("crawler_fetched_bytes_total", "Bytes of HTML or XML fetched", ["host"])
+extraction_seconds = histogram("crawler_extraction_duration_seconds", "Time spent in extraction strategies", ["strategy"])
+
+
+def record_result(result: CrawlResult):
+    """Count a crawl result and the bytes it fetched, page cache hits fetched nothing"""
+    host = urlsplit(result.url).hostname or ""
+    crawl_results.inc(host=host, outcome="success" if result.success else "failed")
+    if not (result.cache_status or "").startswith("hit"):
+        fetched_bytes.inc(len(result.html or ""), host=host)
+
+
+def time_extraction(crawler_config: CrawlerRunConfig):
+    """Time the config's extraction strategy, only possible when it runs in this process"""
+    strategy = crawler_config.extraction_strategy
+    if strategy is None or getattr(strategy, "_timed", False):
+        return
+    run = strategy.run
+
+    def timed_run(*args, **kwargs):
+        with extraction_seconds.time(strategy=type(strategy).__name__):
+            return run(*args, **kwargs)
+
+    strategy.run = timed_run
+    strategy._timed = True
+
+
+def is_cacheable(crawler_config: CrawlerRunConfig) -> bool:
+    """Only stateless single-page crawls can be served from the page cache: session and
+    JS-driven crawls depend on what ran before, deep crawls return many pages.
+    CacheMode.DISABLED opts a crawl out."""
+    return (
+        crawler_config.deep_crawl_strategy is None
+        and not crawler_config.session_id
+        and not crawler_config.js_only
+        and not crawler_config.js_code
+        and crawler_config.cache_mode != CacheMode.DISABLED
+    )
 
 
 class CrawlerWrapper:
-    """Unified interface for local and remote crawling"""
-    
-    def __init__(self, browser_config: BrowserConfig, local: bool = True, base_url: str = "https://crawl.francescomeli.com"):
+    """Unified interface for local and remote crawling.
+
+    The browser (or remote client) is started once and kept warm across crawls, use the
+    wrapper as an async context manager to bound its lifetime. It is only restarted when
+    a crawl fails and the health check says it stopped responding.
+
+    With a page cache, cacheable crawls are answered from it while fresh, and once stale
+    a conditional GET decides whether the page must be rendered and extracted again.
+
+    Transient failures (timeouts, dropped connections, 429 and 5xx answers) are retried
+    with the retry policy's per-host backoff and budget, they never restart the browser.
+    Calls to the remote server go through a circuit breaker, so an unreachable server
+    fails crawls at once instead of timing out on each of them."""
+
+    def __init__(self, browser_config: BrowserConfig, local: bool = True, base_url: str = "https://crawl.francescomeli.com",
+                 page_cache: Optional[PageCache] = None, retry_policy: Optional[RetryPolicy] = None):
         self.local = local
         self.base_url = base_url
         self.browser_config = browser_config
+        self.page_cache = page_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit = CircuitBreaker(f"crawl4ai {urlsplit(base_url).hostname}")
         self.crawler: Optional[AsyncWebCrawler] = None
         self.client: Optional[Crawl4aiDockerClient] = None
-        
-        if local:
-            self.crawler = AsyncWebCrawler(config=browser_config)
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.started = False
+        self.restarts = 0
+
+    async def start(self):
+        """Start the browser or remote client, no-op when already running"""
+        if self.started:
+            return
+        if self.local:
+            self.crawler = AsyncWebCrawler(config=self.browser_config)
+            await self.crawler.start()
         else:
-            self.client = Crawl4aiDockerClient(base_url=base_url)
-    
+            self.client = Crawl4aiDockerClient(base_url=self.base_url)
+        if not self.local or self.page_cache is not None:
+            # Health checks of the remote server and page cache revalidation
+            self.http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        self.started = True
+
+    async def close(self):
+        """Stop the browser or remote client"""
+        self.started = False
+        try:
+            if self.crawler is not None:
+                await self.crawler.close()
+            if self.client is not None:
+                await self.client.close()
+            if self.http_session is not None:
+                await self.http_session.close()
+        finally:
+            self.crawler = None
+            self.client = None
+            self.http_session = None
+
+    async def restart(self):
+        """Tear down and start again, used when the browser or client stopped responding"""
+        try:
+            await self.close()
+        except Exception as e:
+            print(f"Error while closing crawler: {e}")
+        await self.start()
+        self.restarts += 1
+
+    async def is_healthy(self) -> bool:
+        """Check that the browser is still connected, or that the remote server answers"""
+        if not self.started:
+            return False
+        if self.local:
+            assert self.crawler is not None
+            browser_manager = getattr(self.crawler.crawler_strategy, "browser_manager", None)
+            browser = getattr(browser_manager, "browser", None)
+            if browser is not None:
+                return browser.is_connected()
+            return bool(getattr(self.crawler, "ready", True))
+        else:
+            assert self.http_session is not None
+            try:
+                async with self.http_session.get(f"{self.base_url}/health") as response:
+                    return response.status == 200
+            except (aiohttp.ClientError, TimeoutError):
+                return False
+
     async def crawl(self, url: str, crawler_config: CrawlerRunConfig) -> List[CrawlResult]:
+        await self.start()
+        if self.page_cache is None or not is_cacheable(crawler_config):
+            return await self._timed_crawl(url, crawler_config)
+
+        cache_key = self.page_cache.key(url, crawler_config.dump())
+        cached = self.page_cache.get(cache_key)
+        if cached is not None and (cached.fresh or await self._unchanged(url, cached)):
+            cache_requests.inc(outcome="hit" if cached.fresh else "revalidated")
+            if not cached.fresh:
+                self.page_cache.refresh(cache_key)
+            cached.result.cache_status = "hit" if cached.fresh else "hit_validated"
+            record_result(cached.result)
+            return [cached.result]
+
+        results = await self._timed_crawl(url, crawler_config)
+        cache_requests.inc(outcome="miss")
+        if len(results) == 1:
+            self.page_cache.put(cache_key, results[0])
+        return results
+
+    async def _unchanged(self, url: str, cached: CachedPage) -> bool:
+        """Ask the server whether a stale cached page changed, without rendering it"""
+        headers = cached.conditional_headers()
+        if not headers:
+            return False
+        assert self.http_session is not None
+        try:
+            async with self.http_session.get(url, headers=headers, allow_redirects=False) as response:
+                return response.status == 304
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def _timed_crawl(self, url: str, crawler_config: CrawlerRunConfig) -> List[CrawlResult]:
+        if self.local:
+            time_extraction(crawler_config)
+        started = time.perf_counter()
+
+        async def attempt() -> List[CrawlResult]:
+            try:
+                return await self._crawl(url, crawler_config)
+            except Exception as e:
+                # A transient error is the retry policy's business, a restart wouldn't help
+                if is_retryable(e) or await self.is_healthy():
+                    raise
+                print("✗ Crawler stopped responding, restarting it")
+                await self.restart()
+                return await self._crawl(url, crawler_config)
+
+        if crawler_config.js_only:
+            # A step of a session flow (clicking "next"...), running it twice would skip ahead
+            results = await attempt()
+        else:
+            results = await self.retry_policy.call(
+                url,
+                attempt,
+                # A deep crawl returns many pages, only single page failures are retried
+                retryable_result=lambda results: len(results) == 1 and result_is_retryable(results[0]),
+                result_delay=lambda results: retry_after(results[0].response_headers),
+            )
+        crawl_seconds.observe(time.perf_counter() - started, host=urlsplit(url).hostname or "")
+        for result in results:
+            record_result(result)
+        return results
+
+    async def crawl_many(self, urls: List[str], crawler_config: CrawlerRunConfig, concurrency: int = 5,
+                         domain_delay: Tuple[float, float] = (1.0, 3.0), batch_size: int = 10) -> AsyncIterator[CrawlResult]:
+        """Crawl several URLs with bounded parallelism, yielding results as they complete.
+
+        Requests to the same domain are spaced by a random delay in domain_delay, which backs
+        off on 429/503 answers. Locally at most `concurrency` pages are open at once, remotely
+        URLs are sent in batches of batch_size with at most `concurrency` batches in flight."""
+        await self.start()
+        if not urls:
+            return
+        rate_limiter = RateLimiter(base_delay=domain_delay)
+
+        if self.local:
+            assert self.crawler is not None
+            time_extraction(crawler_config)
+            dispatcher = SemaphoreDispatcher(semaphore_count=concurrency, rate_limiter=rate_limiter)
+            results = await self.crawler.arun_many(
+                urls=urls,
+                config=crawler_config.clone(stream=True),
+                dispatcher=dispatcher,
+            )
+            async for result in results:
+                record_result(result)
+                yield result
+            return
+
+        # Remote batches run concurrently and hand their results over through a queue
+        batch_config = crawler_config.clone(stream=False)
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def crawl_batch(batch: List[str]):
+            try:
+                async with semaphore:
+                    for url in batch:
+                        await rate_limiter.wait_if_needed(url)
+                    result = await self.retry_policy.call(batch[0], lambda: self._remote_crawl(batch, batch_config))
+                    for item in (result if isinstance(result, list) else [result]):
+                        if item.status_code:
+                            rate_limiter.update_delay(item.url, item.status_code)
+                        record_result(item)
+                        await queue.put(item)
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                await queue.put(None)
+
+        batches = [urls[start:start + batch_size] for start in range(0, len(urls), batch_size)]
+        tasks = [asyncio.create_task(crawl_batch(batch)) for batch in batches]
+        try:
+            pending = len(tasks)
+            while pending:
+                item = await queue.get()
+                if item is None:
+                    pending -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield cast(CrawlResult, item)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _crawl(self, url: str, crawler_config: CrawlerRunConfig) -> List[CrawlResult]:
         if self.local:
             assert self.crawler is not None
             result = await self.crawler.arun(
                 url=url,
                 config=crawler_config,
             )
-            return cast(List[CrawlResult], result if isinstance(result, list) else [result])  
+            return cast(List[CrawlResult], result if isinstance(result, list) else [result])
         else:
-            assert self.client is not None
-            result = await self.client.crawl(
-                urls=[url],
-                browser_config=self.browser_config,
-                crawler_config=crawler_config,
-            )
+            result = await self._remote_crawl([url], crawler_config)
             return cast(List[CrawlResult], result if isinstance(result, list) else [result])
-    
+
+    async def _remote_crawl(self, urls: List[str], crawler_config: CrawlerRunConfig):
+        """Crawl on the remote server through the circuit breaker"""
+        assert self.client is not None
+        client = self.client
+        return await self.circuit.call(lambda: client.crawl(
+            urls=urls,
+            browser_config=self.browser_config,
+            crawler_config=crawler_config,
+        ))
+
     async def __aenter__(self):
+        await self.start()
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        pass
+        await self.close()
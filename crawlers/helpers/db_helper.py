@@ -1,21 +1,80 @@
+import json
+import hashlib
 import sqlite3
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
+from helpers.metrics import SIZE_BUCKETS, counter, histogram
+
+# Value types sqlite3 can bind without an adapter
+SUPPORTED_TYPES = (str, int, float, bytes, type(None))
+# Exact types checked first, subclasses (bool...) go through isinstance
+_EXACT_TYPES = frozenset(SUPPORTED_TYPES)
+# json.dumps sets up a new encoder on every call, the row hashes share this one
+_HASH_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=repr)
+
+write_batch_rows = histogram("db_write_batch_rows", "Rows per write transaction", ["table"], SIZE_BUCKETS)
+write_batch_seconds = histogram("db_write_batch_duration_seconds", "Time to write one batch", ["table"])
+rows_written = counter("db_rows_written_total", "Rows saved, by outcome", ["table", "outcome"])
+
+# Hidden column with a hash of each row's field values, writes are skipped when it matches
+HASH_COLUMN = "_content_hash"
+
+# Outcome of every page of incremental crawls, failed and pending pages are crawled first by the next run
+CRAWL_PAGES_TABLE = "_crawl_pages"
+# Failed pages are given up after this many attempts
+MAX_PAGE_ATTEMPTS = 5
+
+
+def content_hash(values: List[Any]) -> str:
+    """Hash of a row's field values ordered by field name, encoded as canonical JSON"""
+    return hashlib.blake2b(_HASH_ENCODER.encode(values).encode("utf-8"), digest_size=16).hexdigest()
 
 
 class DatabaseHelper:
     """Helper class for saving scraped data to SQLite database"""
     
-    def __init__(self, db_directory: str, scraper_name: str, schema: Dict[str, Any]):
+    def __init__(self, db_directory: str, scraper_name: str, schema: Dict[str, Any], batch_size: int = 500,
+                 check_same_thread: bool = True):
         self.db_directory = db_directory
         self.scraper_name = scraper_name
         self.db_path = str(Path(db_directory) / f"{scraper_name}.db")
         self.table_name = schema.get("name", "scraped_data").replace(" ", "_").lower()
         self.fields = schema.get("fields", []) + schema.get("baseFields", [])
         self.primary_key = schema.get("primary_key", "id")  # Default to 'id', but allow override
+        self.batch_size = batch_size  # Rows written per transaction by save_data
+        self.errors: List[Dict[str, Any]] = []  # Rows rejected by the last save_data call
+        self.last_counts = {"inserted": 0, "updated": 0, "unchanged": 0}  # Outcome of the last save_data call
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
+        # check_same_thread=False lets a helper be driven through asyncio.to_thread, one call at a time
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+        # WAL lets the API keep reading while a crawler is writing
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Safe in WAL mode, commits no longer wait for an fsync of the main database
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # INSERT OR REPLACE only fires the delete triggers that keep the
+        # full-text index in sync when recursive triggers are enabled
+        self.conn.execute("PRAGMA recursive_triggers=ON")
         self.cursor = self.conn.cursor()
+        
+        # Built once, sqlite3 keeps the compiled statement in its cache between calls
+        self.field_names = [field["name"] for field in self.fields]
+        columns_str = ", ".join(self.field_names + [HASH_COLUMN])
+        placeholders = ", ".join(["?" for _ in self.field_names] + ["?"])
+        if self.primary_key in self.field_names:
+            # Rows whose hash didn't change are left alone, keeping created_at, updated_at and the indexes as they are
+            assignments = "".join(f"{name} = excluded.{name}, " for name in self.field_names if name != self.primary_key)
+            self.insert_sql = f"""
+            INSERT INTO {self.table_name} ({columns_str}, updated_at)
+            VALUES ({placeholders}, CURRENT_TIMESTAMP)
+            ON CONFLICT ({self.primary_key}) DO UPDATE SET
+                {assignments}{HASH_COLUMN} = excluded.{HASH_COLUMN}, updated_at = CURRENT_TIMESTAMP
+            WHERE {HASH_COLUMN} IS NOT excluded.{HASH_COLUMN}
+            """
+        else:
+            self.insert_sql = f"""
+            INSERT OR REPLACE INTO {self.table_name} ({columns_str}, updated_at)
+            VALUES ({placeholders}, CURRENT_TIMESTAMP)
+            """
     
     def create_table_from_schema(self):
         """Create a table based on the extraction schema"""
@@ -34,6 +93,7 @@ class DatabaseHelper:
         # Add metadata columns
         columns.append("created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
         columns.append("updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+        columns.append(f"{HASH_COLUMN} TEXT")
         
         columns_str = ", ".join(columns)
         
@@ -44,44 +104,299 @@ class DatabaseHelper:
         """
         
         self.cursor.execute(create_table_sql)
+        
+        # Tables created before content hashing get the column, their rows are hashed on the next write
+        self.cursor.execute(f"PRAGMA table_info({table_name})")
+        if HASH_COLUMN not in [row[1] for row in self.cursor.fetchall()]:
+            self.cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {HASH_COLUMN} TEXT")
+        
+        # Serves the API's created_at ordering and its (created_at, primary key) cursors
+        index_columns = "created_at"
+        if any(field["name"] == self.primary_key for field in self.fields):
+            index_columns += f", {self.primary_key}"
+        self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_created_at ON {table_name} ({index_columns})")
+        
+        self.create_search_index()
         self.conn.commit()
         return table_name
     
-    def save_data(self, data: List[Dict[str, Any]]):
-        """Save scraped data to the database"""
+    def create_search_index(self):
+        """Create an FTS5 index over the table, kept in sync by triggers"""
+        table_name = self.table_name
+        fts_table = f"_fts_{table_name}"
+        
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (fts_table,))
+        if self.cursor.fetchone():
+            return fts_table
+        
+        # Index every column so searches without a column filter behave like before,
+        # hidden columns (leading underscore) are not searchable
+        self.cursor.execute(f"PRAGMA table_info({table_name})")
+        columns = [row[1] for row in self.cursor.fetchall() if not row[1].startswith("_")]
+        columns_str = ", ".join(columns)
+        new_values = ", ".join(f"new.{col}" for col in columns)
+        old_values = ", ".join(f"old.{col}" for col in columns)
+        
+        # The trigram tokenizer matches arbitrary substrings, like the LIKE '%term%' search it replaces
+        self.cursor.execute(f"""
+        CREATE VIRTUAL TABLE {fts_table} USING fts5(
+            {columns_str}, content='{table_name}', content_rowid='rowid', tokenize='trigram'
+        )
+        """)
+        self.cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table_name} BEGIN
+            INSERT INTO {fts_table}(rowid, {columns_str}) VALUES (new.rowid, {new_values});
+        END
+        """)
+        self.cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table_name} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {columns_str}) VALUES ('delete', old.rowid, {old_values});
+        END
+        """)
+        self.cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {table_name} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {columns_str}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO {fts_table}(rowid, {columns_str}) VALUES (new.rowid, {new_values});
+        END
+        """)
+        
+        # Index rows that were saved before the index existed
+        self.cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        return fts_table
+    
+    def save_data(self, data: List[Dict[str, Any]], batch_size: Optional[int] = None):
+        """Save scraped data to the database in batches of one statement each, returns the number of rows saved.
+        Rows that fail are reported in self.errors without aborting the rest, self.last_counts
+        splits the saved rows into inserted, updated and unchanged."""
+        self.errors = []
+        self.last_counts = {"inserted": 0, "updated": 0, "unchanged": 0}
         if not data:
             print("No data to save")
             return 0
         
-        field_names = [field["name"] for field in self.fields]
+        rows, items = self._validate_rows(data, self.field_names)
+        batch_size = batch_size or self.batch_size
+        upsert = self.primary_key in self.field_names
         
-        # Prepare INSERT OR REPLACE statement
-        placeholders = ", ".join(["?" for _ in field_names])
-        columns_str = ", ".join(field_names)
-        
-        insert_sql = f"""
-        INSERT OR REPLACE INTO {self.table_name} ({columns_str}, updated_at)
-        VALUES ({placeholders}, CURRENT_TIMESTAMP)
-        """
+        saved_count = 0
+        # One commit for the whole call, a failing batch only rolls back to its savepoint
+        with self.conn:
+            self._begin()
+            # New rows get rowids past the current maximum, updated rows keep theirs
+            max_rowid = self._max_rowid() if upsert else 0
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                with write_batch_seconds.time(table=self.table_name):
+                    saved, written = self._write_batch(self.insert_sql, batch, items[start:start + batch_size])
+                write_batch_rows.observe(len(batch), table=self.table_name)
+                if upsert:
+                    last_rowid, max_rowid = max_rowid, self._max_rowid()
+                    inserted = max_rowid - last_rowid
+                else:
+                    inserted = saved
+                # The upsert skips rows whose hash matches, those are the unchanged ones
+                self.last_counts["inserted"] += inserted
+                self.last_counts["updated"] += written - inserted
+                self.last_counts["unchanged"] += saved - written
+                saved_count += saved
+        for outcome, count in self.last_counts.items():
+            rows_written.inc(count, table=self.table_name, outcome=outcome)
+        return saved_count
+    
+    def _begin(self):
+        if not self.conn.in_transaction:
+            self.cursor.execute("BEGIN")
+    
+    def _max_rowid(self) -> int:
+        self.cursor.execute(f"SELECT MAX(rowid) FROM {self.table_name}")
+        return self.cursor.fetchone()[0] or 0
+    
+    def _validate_rows(self, data: List[Dict[str, Any]], field_names: List[str]) -> Tuple[List[List[Any]], List[Dict[str, Any]]]:
+        """Extract the values of each row in column order followed by their content hash,
+        dropping rows that can't be saved. Returns the values and the rows they came from."""
+        pk_index = field_names.index(self.primary_key) if self.primary_key in field_names else None
+        # The hash covers the values by field name, the column order doesn't change it
+        hash_order = sorted(range(len(field_names)), key=field_names.__getitem__)
         
-        inserted_count = 0
+        rows = []
+        items = []
         for item in data:
+            if not isinstance(item, dict):
+                self._record_error(item, "row is not a mapping")
+                continue
+            
             # Extract values in the correct order
             values = [item.get(field_name) for field_name in field_names]
             
             # Skip if primary key is None or empty
-            if self.primary_key in field_names and not values[field_names.index(self.primary_key)]:
+            if pk_index is not None and not values[pk_index]:
                 continue
             
+            if not _EXACT_TYPES.issuperset(map(type, values)):
+                invalid_fields = [name for name, value in zip(field_names, values) if not isinstance(value, SUPPORTED_TYPES)]
+                if invalid_fields:
+                    self._record_error(item, f"unsupported value type for {', '.join(invalid_fields)}")
+                    continue
+            
+            values.append(content_hash([values[index] for index in hash_order]))
+            rows.append(values)
+            items.append(item)
+        return rows, items
+    
+    def _write_batch(self, insert_sql: str, rows: List[List[Any]], items: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Write a batch of rows inside the current transaction, returns how many were saved and
+        how many of those the statement actually wrote (an upsert skips unchanged rows)"""
+        self.cursor.execute("SAVEPOINT write_batch")
+        try:
+            self.cursor.executemany(insert_sql, rows)
+            return len(rows), self.cursor.rowcount
+        except sqlite3.Error:
+            self.cursor.execute("ROLLBACK TO write_batch")
+        finally:
+            self.cursor.execute("RELEASE write_batch")
+        
+        # The batch was rolled back, replay it row by row to isolate the failing rows
+        saved = written = 0
+        for values, item in zip(rows, items):
             try:
                 self.cursor.execute(insert_sql, values)
-                inserted_count += 1
+                saved += 1
+                written += self.cursor.rowcount
             except sqlite3.Error as e:
-                print(f"Error inserting data: {e}")
-                print(f"Data: {item}")
+                self._record_error(item, str(e))
+        return saved, written
+    
+    def _record_error(self, item: Any, error: str):
+        print(f"Error inserting data: {error}")
+        print(f"Data: {item}")
+        self.errors.append({"data": item, "error": error})
+    
+    def sync_data(self, data: List[Dict[str, Any]], scope_field: Optional[str] = None,
+                  scope_value: Optional[str] = None) -> Dict[str, int]:
+        """Make the table match data: insert new keys, update changed rows and delete missing keys.
+        With a scope, only rows where scope_field equals scope_value are candidates for deletion."""
+        self.begin_sync()
+        self.stage_sync(data)
+        return self.finish_sync(scope_field, scope_value)
+    
+    def begin_sync(self):
+        """Start a differential sync, rows are staged in a temp table until finish_sync"""
+        if not any(field["name"] == self.primary_key for field in self.fields):
+            raise ValueError(f"Differential sync requires the primary key '{self.primary_key}' in the schema")
+        
+        # Same column affinity as the real table, so unchanged values compare equal
+        columns = []
+        for field in self.fields:
+            field_name = field["name"]
+            if field_name == self.primary_key:
+                columns.append(f"{field_name} TEXT PRIMARY KEY")
+            else:
+                columns.append(f"{field_name} TEXT")
+        columns.append(f"{HASH_COLUMN} TEXT")
+        
+        self.cursor.execute("DROP TABLE IF EXISTS temp._sync_incoming")
+        self.cursor.execute(f"CREATE TEMP TABLE _sync_incoming ({', '.join(columns)})")
+    
+    def stage_sync(self, data: List[Dict[str, Any]]) -> int:
+        """Stage rows for the running sync, returns the number of rows staged"""
+        field_names = self.field_names
+        columns_str = ", ".join(field_names + [HASH_COLUMN])
+        placeholders = ", ".join(["?" for _ in field_names] + ["?"])
+        # Later rows win, like repeated upserts on the real table
+        stage_sql = f"INSERT OR REPLACE INTO temp._sync_incoming ({columns_str}) VALUES ({placeholders})"
+        
+        self.errors = []
+        rows, items = self._validate_rows(data, field_names)
+        staged_count = 0
+        with self.conn:
+            self._begin()
+            for start in range(0, len(rows), self.batch_size):
+                end = start + self.batch_size
+                staged_count += self._write_batch(stage_sql, rows[start:end], items[start:end])[0]
+        return staged_count
+    
+    def finish_sync(self, scope_field: Optional[str] = None, scope_value: Optional[str] = None) -> Dict[str, int]:
+        """Merge the staged rows into the table in one transaction, returns added/changed/removed counts"""
+        table_name = self.table_name
+        pk = self.primary_key
+        field_names = self.field_names
+        columns_str = ", ".join(field_names + [HASH_COLUMN])
+        
+        scope_sql = ""
+        scope_params: Tuple[Any, ...] = ()
+        if scope_field is not None:
+            scope_sql = f"{scope_field} = ? AND "
+            scope_params = (scope_value,)
+        
+        # Rows are compared by content hash, rows saved before hashing existed are rewritten once
+        assignments = "".join(f"{name} = incoming.{name}, " for name in field_names if name != pk)
+        
+        # The staging above only touched the temp database, the write lock is held from here on
+        with write_batch_seconds.time(table=table_name), self.conn:
+            self.cursor.execute(f"""
+            DELETE FROM {table_name}
+            WHERE {scope_sql}{pk} NOT IN (SELECT {pk} FROM temp._sync_incoming)
+            """, scope_params)
+            removed_count = self.cursor.rowcount
+            
+            self.cursor.execute(f"""
+            UPDATE {table_name} SET {assignments}{HASH_COLUMN} = incoming.{HASH_COLUMN}, updated_at = CURRENT_TIMESTAMP
+            FROM temp._sync_incoming AS incoming
+            WHERE {table_name}.{pk} = incoming.{pk} AND {table_name}.{HASH_COLUMN} IS NOT incoming.{HASH_COLUMN}
+            """)
+            changed_count = self.cursor.rowcount
+            
+            self.cursor.execute(f"""
+            INSERT INTO {table_name} ({columns_str})
+            SELECT {columns_str} FROM temp._sync_incoming AS incoming
+            WHERE NOT EXISTS (SELECT 1 FROM {table_name} WHERE {table_name}.{pk} = incoming.{pk})
+            """)
+            added_count = self.cursor.rowcount
         
+        self.cursor.execute("DROP TABLE IF EXISTS temp._sync_incoming")
+        rows_written.inc(added_count, table=table_name, outcome="inserted")
+        rows_written.inc(changed_count, table=table_name, outcome="updated")
+        rows_written.inc(removed_count, table=table_name, outcome="deleted")
+        return {"added": added_count, "changed": changed_count, "removed": removed_count}
+    
+    def create_crawl_pages_table(self):
+        """Create the table recording the pages of incremental crawls, shared by the tables of a database"""
+        self.cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CRAWL_PAGES_TABLE} (
+            table_name TEXT,
+            url TEXT,
+            status TEXT,
+            items INTEGER DEFAULT 0,
+            new_items INTEGER DEFAULT 0,
+            error TEXT,
+            attempts INTEGER DEFAULT 0,
+            crawled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (table_name, url)
+        )
+        """)
         self.conn.commit()
-        return inserted_count
+    
+    def record_page(self, url: str, status: str, items: int = 0, new_items: int = 0, error: Optional[str] = None):
+        """Record a crawled page (new, known, empty or failed) or a discovered one (pending).
+        Failed attempts add up until the page is crawled successfully."""
+        attempts = "attempts + 1" if status == "failed" else "0"
+        with self.conn:
+            self.cursor.execute(f"""
+            INSERT INTO {CRAWL_PAGES_TABLE} (table_name, url, status, items, new_items, error, attempts, crawled_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (table_name, url) DO UPDATE SET
+                status = excluded.status, items = excluded.items, new_items = excluded.new_items,
+                error = excluded.error, attempts = {attempts}, crawled_at = CURRENT_TIMESTAMP
+            """, (self.table_name, url, status, items, new_items, error, 1 if status == "failed" else 0))
+    
+    def pages_to_retry(self) -> List[str]:
+        """Pages a previous incremental crawl failed or did not reach, oldest first"""
+        self.cursor.execute(f"""
+        SELECT url FROM {CRAWL_PAGES_TABLE}
+        WHERE table_name = ? AND (status = 'pending' OR (status = 'failed' AND attempts < ?))
+        ORDER BY crawled_at, rowid
+        """, (self.table_name, MAX_PAGE_ATTEMPTS))
+        return [row[0] for row in self.cursor.fetchall()]
     
     def get_all_data(self) -> List[Dict[str, Any]]:
         """Retrieve all data from the table"""
@@ -90,6 +405,16 @@ class DatabaseHelper:
         rows = self.cursor.fetchall()
         return [dict(zip(columns, row)) for row in rows]
     
+    def count(self) -> int:
+        """Number of rows in the table"""
+        self.cursor.execute(f"SELECT COUNT(*) FROM {self.table_name}")
+        return self.cursor.fetchone()[0]
+    
+    def get_keys(self) -> Set[Any]:
+        """Primary key values of every row in the table"""
+        self.cursor.execute(f"SELECT {self.primary_key} FROM {self.table_name}")
+        return {row[0] for row in self.cursor.fetchall()}
+    
     def delete_by_field(self, field_name: str, field_value: str) -> int:
         """Delete records where field matches value"""
         delete_sql = f"DELETE FROM {self.table_name} WHERE {field_name} = ?"
@@ -106,3 +431,4 @@ class DatabaseHelper:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+from crawl4ai import CrawlResult
+from helpers.metrics import counter
+
+cache_requests = counter("page_cache_requests_total", "Page cache lookups, by outcome", ["outcome"])
+
+# Fields of a crawl result worth keeping, the rest is per-crawl noise or too large (screenshots, pdfs)
+CACHED_FIELDS = {"url", "html", "success", "status_code", "response_headers", "extracted_content",
+                 "redirected_url", "metadata"}
+
+
+class CachedPage:
+    """A cached crawl result with its validators"""
+
+    def __init__(self, key: str, result: CrawlResult, etag: Optional[str], last_modified: Optional[str], fresh: bool):
+        self.key = key
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = fresh
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers asking the server to answer 304 when the page is unchanged"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """On-disk cache of crawl results, content-addressed and bounded in size.
+
+    Results are keyed by URL and the normalized request config (so a schema change
+    never serves stale extractions), stored compressed in files named by the hash of
+    their content (identical pages share one file) and indexed in a small SQLite database.
+    An entry is fresh for ttl seconds, after that it can be revalidated with its
+    ETag / Last-Modified. Least recently used entries are evicted beyond max_bytes."""
+
+    def __init__(self, directory: str, ttl: float = 0, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        (self.directory / "blobs").mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.directory / "index.db"))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS pages (
+            key TEXT PRIMARY KEY,
+            url TEXT,
+            digest TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            stored_at REAL,
+            accessed_at REAL
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed_at)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(url: str, config: Any) -> str:
+        """Cache key of a URL crawled with a config (any JSON-serializable description of it)"""
+        normalized = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(f"{url}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedPage]:
+        """The cached page for a key, fresh or stale, None on a miss"""
+        row = self.conn.execute(
+            "SELECT digest, etag, last_modified, stored_at FROM pages WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        digest, etag, last_modified, stored_at = row
+        try:
+            data = json.loads(zlib.decompress(self._blob_path(digest).read_bytes()))
+        except (OSError, zlib.error, ValueError):
+            # The blob was removed or is corrupt, forget the entry
+            self._delete_keys([key])
+            return None
+        self.conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        result = CrawlResult(**data)
+        result.cached_at = stored_at
+        return CachedPage(key, result, etag, last_modified, fresh=time.time() - stored_at < self.ttl)
+
+    def put(self, key: str, result: CrawlResult):
+        """Store a successful crawl result, then evict down to max_bytes"""
+        if not result.success:
+            return
+        blob = zlib.compress(json.dumps(result.model_dump(mode="json", include=CACHED_FIELDS)).encode("utf-8"))
+        digest = hashlib.sha256(blob).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(blob)
+            os.replace(tmp_path, path)
+
+        headers = {name.lower(): value for name, value in (result.response_headers or {}).items()}
+        now = time.time()
+        previous = self.conn.execute("SELECT digest FROM pages WHERE key = ?", (key,)).fetchone()
+        self.conn.execute("INSERT OR IGNORE INTO blobs (digest, size) VALUES (?, ?)", (digest, len(blob)))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (key, url, digest, etag, last_modified, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, result.url, digest, headers.get("etag"), headers.get("last-modified"), now, now),
+        )
+        if previous and previous[0] != digest:
+            self._delete_orphans([previous[0]])
+        self.conn.commit()
+        self._evict()
+
+    def refresh(self, key: str):
+        """The server confirmed the page is unchanged, it is fresh for another ttl"""
+        now = time.time()
+        self.conn.execute("UPDATE pages SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+        self.conn.commit()
+
+    def size(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.directory / "blobs" / digest[:2] / digest
+
+    def _evict(self):
+        size = self.size()
+        if size <= self.max_bytes:
+            return
+        # Oldest accessed first, until the distinct blobs fit again
+        for key, digest in self.conn.execute("SELECT key, digest FROM pages ORDER BY accessed_at").fetchall():
+            if size <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            blob_size = self._delete_orphans([digest])
+            size -= blob_size
+        self.conn.commit()
+
+    def _delete_keys(self, keys):
+        digests = [row[0] for key in keys for row in self.conn.execute("SELECT digest FROM pages WHERE key = ?", (key,))]
+        self.conn.executemany("DELETE FROM pages WHERE key = ?", [(key,) for key in keys])
+        self._delete_orphans(digests)
+        self.conn.commit()
+
+    def _delete_orphans(self, digests) -> int:
+        """Remove the blobs no entry points to anymore, returns the bytes freed"""
+        freed = 0
+        for digest in set(digests):
+            if self.conn.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                continue
+            row = self.conn.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._blob_path(digest).unlink(missing_ok=True)
+            freed += row[0] if row else 0
+        return freed
+
+
+def open_page_cache(directory: str, ttl: str = "0", max_mb: str = "256") -> Optional[PageCache]:
+    """The page cache configured by the environment, None when no directory is set"""
+    if not directory:
+        return None
+    return PageCache(directory, ttl=float(ttl), max_bytes=int(float(max_mb) * 1024 * 1024))
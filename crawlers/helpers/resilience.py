@@ -0,0 +1,281 @@
+import time
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+import aiohttp
+import httpx
+from crawl4ai import CrawlResult
+from helpers.metrics import counter, gauge
+
+T = TypeVar("T")
+
+retries = counter("crawler_retries_total", "Requests retried after a transient failure", ["host", "reason"])
+retries_denied = counter("crawler_retries_denied_total", "Retries refused because the retry budget was spent", ["host"])
+circuit_state = gauge("crawler_circuit_state", "Circuit breaker state: 0 closed, 1 half open, 2 open", ["circuit"])
+
+# Statuses worth another attempt, the others mean the request itself is wrong
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# Error messages of transient failures, from Playwright / Chromium and the HTTP clients
+RETRYABLE_MESSAGES = (
+    "timeout", "timed out", "net::err_connection", "net::err_timed_out", "net::err_network",
+    "net::err_empty_response", "net::err_internet_disconnected", "net::err_name_not_resolved",
+    "connection reset", "connection refused", "server disconnected",
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+
+def is_retryable(error: Optional[BaseException] = None, status: Optional[int] = None,
+                 message: Optional[str] = None) -> bool:
+    """Whether a failure is transient: timeouts, dropped connections, 429 and 5xx answers"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, aiohttp.ClientResponseError):
+        status = error.status
+    elif isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    elif isinstance(error, (asyncio.TimeoutError, ConnectionError, aiohttp.ClientConnectionError,
+                            aiohttp.ClientPayloadError, httpx.TransportError)):
+        return True
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    text = (message or (str(error) if error is not None else "")).lower()
+    return any(pattern in text for pattern in RETRYABLE_MESSAGES)
+
+
+def result_is_retryable(result: CrawlResult) -> bool:
+    """Whether a crawl result is a transient failure (crawl4ai reports some errors as results)"""
+    if result.status_code in RETRYABLE_STATUSES:
+        return True
+    return not result.success and is_retryable(message=result.error_message)
+
+
+def retry_after(headers: Optional[Dict[str, str]]) -> Optional[float]:
+    """Seconds asked for by a Retry-After header, HTTP dates are ignored"""
+    for name, value in (headers or {}).items():
+        if name.lower() == "retry-after":
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return None
+    return None
+
+
+class Backoff:
+    """Exponential backoff with full jitter: a random delay between min_delay and
+    base * factor ** attempt, capped at max_delay"""
+
+    def __init__(self, base: float = 1.0, max_delay: float = 60.0, factor: float = 2.0, min_delay: float = 0.0):
+        self.base = base
+        self.max_delay = max_delay
+        self.factor = factor
+        self.min_delay = min_delay
+
+    def delay(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base * self.factor ** attempt)
+        return random.uniform(self.min_delay, max(self.min_delay, ceiling))
+
+
+class HostBackoff:
+    """Backoff shared by every request to a host: after a failure, requests to that host wait
+    until the backoff (or the server's Retry-After) elapsed, a success resets it"""
+
+    def __init__(self, backoff: Optional[Backoff] = None):
+        self.backoff = backoff or Backoff()
+        self._failures: Dict[str, int] = {}
+        self._not_before: Dict[str, float] = {}
+
+    async def wait(self, host: str):
+        delay = self._not_before.get(host, 0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def failure(self, host: str, server_delay: Optional[float] = None):
+        failures = self._failures.get(host, 0)
+        self._failures[host] = failures + 1
+        delay = max(self.backoff.delay(failures), server_delay or 0)
+        self._not_before[host] = max(self._not_before.get(host, 0), time.monotonic() + delay)
+
+    def success(self, host: str):
+        self._failures.pop(host, None)
+        self._not_before.pop(host, None)
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the traffic so a failing site isn't hammered.
+
+    Every request deposits `ratio` tokens, every retry spends one. The bucket starts
+    with and never holds more than `reserve` tokens."""
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.tokens = reserve
+
+    def record_request(self):
+        self.tokens = min(self.reserve, self.tokens + self.ratio)
+
+    def can_retry(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    """Stops calling an endpoint after failure_threshold consecutive transient failures.
+
+    While open, calls fail at once with CircuitOpenError. After reset_timeout seconds one
+    trial call is let through (half open): a success closes the circuit, a failure opens
+    it again."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        circuit_state.set(0, circuit=name)
+
+    def before_call(self):
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Circuit {self.name} is open, not calling it for now")
+            self._set_state("half_open")
+        if self.state == "half_open":
+            if self._trial_running:
+                raise CircuitOpenError(f"Circuit {self.name} is half open, waiting for the trial call")
+            self._trial_running = True
+
+    def record_success(self):
+        self._trial_running = False
+        self.failures = 0
+        self._set_state("closed")
+
+    def record_failure(self):
+        self._trial_running = False
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            if self.state != "open":
+                print(f"✗ Circuit {self.name} opened after {self.failures} failures")
+            self._set_state("open")
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Call func through the breaker, only transient failures count against it"""
+        self.before_call()
+        try:
+            result = await func()
+        except Exception as e:
+            if is_retryable(e):
+                self.record_failure()
+            raise
+        finally:
+            # Whatever ended the call (a cancelled trial included), the next trial may run
+            self._trial_running = False
+        self.record_success()
+        return result
+
+    def _set_state(self, state: str):
+        self.state = state
+        circuit_state.set({"closed": 0, "half_open": 1, "open": 2}[state], circuit=self.name)
+
+
+# Scraper runs that failed on a transient error run again after this backoff instead of a full interval
+RUN_RETRY_BACKOFF = Backoff(base=60.0, max_delay=1800.0, min_delay=15.0)
+
+
+def run_retry_delay(error: BaseException, failures: int, interval: float) -> Optional[float]:
+    """Seconds before running a failed scrape again, None to wait for its interval.
+
+    Only transient failures (an open circuit breaker included) are retried early, the
+    delay grows with the consecutive failures and never exceeds the interval."""
+    if not (is_retryable(error) or isinstance(error, CircuitOpenError)):
+        return None
+    return min(interval, RUN_RETRY_BACKOFF.delay(max(0, failures - 1)))
+
+
+async def run_forever(run: Callable[[], Awaitable[Any]], interval: float, name: str, jitter: float = 0.0):
+    """Call run every interval seconds (plus up to jitter seconds), never returns.
+
+    The interval is measured from the start of each run, a slow run doesn't push the
+    schedule. A run that failed on a transient error is retried after run_retry_delay
+    when that comes sooner, any other failure waits for the next interval."""
+    loop = asyncio.get_running_loop()
+    failures = 0
+    while True:
+        started = loop.time()
+        error: Optional[Exception] = None
+        try:
+            await run()
+            failures = 0
+        except Exception as e:
+            failures += 1
+            error = e
+            print(f"✗ {name} failed: {e}")
+        delay = max(0.0, interval - (loop.time() - started)) + random.uniform(0, jitter)
+        retry_delay = run_retry_delay(error, failures, interval) if error else None
+        if retry_delay is not None and retry_delay < delay:
+            delay = retry_delay
+            print(f"Retrying {name} in {delay:.0f} seconds after a transient failure")
+        else:
+            print(f"Next {name} run in {delay:.0f} seconds")
+        await asyncio.sleep(delay)
+
+
+class RetryPolicy:
+    """Retries transient failures with per-host backoff, within a retry budget"""
+
+    def __init__(self, max_attempts: int = 3, backoff: Optional[Backoff] = None, budget: Optional[RetryBudget] = None):
+        self.max_attempts = max_attempts
+        self.hosts = HostBackoff(backoff)
+        self.budget = budget or RetryBudget()
+
+    async def call(self, url: str, func: Callable[[], Awaitable[T]],
+                   retryable_result: Optional[Callable[[T], bool]] = None,
+                   result_delay: Optional[Callable[[T], Optional[float]]] = None) -> T:
+        """Call func until it succeeds, fails for good or the attempts run out.
+
+        Exceptions are classified by is_retryable, results by retryable_result. The last
+        result is returned and the last exception raised once no retry is left."""
+        host = urlsplit(url).hostname or ""
+        self.budget.record_request()
+        attempt = 1
+        while True:
+            await self.hosts.wait(host)
+            try:
+                result = await func()
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if not self._may_retry(host, attempt):
+                    self.hosts.failure(host, retry_after(getattr(e, "headers", None)))
+                    raise
+                self.hosts.failure(host, retry_after(getattr(e, "headers", None)))
+                reason = type(e).__name__
+            else:
+                if retryable_result is None or not retryable_result(result):
+                    self.hosts.success(host)
+                    return result
+                server_delay = result_delay(result) if result_delay else None
+                if not self._may_retry(host, attempt):
+                    self.hosts.failure(host, server_delay)
+                    return result
+                self.hosts.failure(host, server_delay)
+                reason = "result"
+            retries.inc(host=host, reason=reason)
+            print(f"✗ Transient failure on {url} ({reason}), retrying (attempt {attempt + 1}/{self.max_attempts})")
+            attempt += 1
+
+    def _may_retry(self, host: str, attempt: int) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        if not self.budget.can_retry():
+            retries_denied.inc(host=host)
+            return False
+        return True
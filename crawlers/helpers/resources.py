@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+from crawl4ai import BrowserConfig
+from helpers.crawler_wrapper import CrawlerWrapper
+from helpers.db_helper import DatabaseHelper
+from helpers.page_cache import PageCache
+from helpers.resilience import RetryPolicy
+from helpers.static_fetcher import StaticFetcher
+from helpers.write_queue import WriteQueue
+
+
+class SharedResources:
+    """Browser and database handles shared by the jobs running in one process.
+
+    The crawler is started on first use so jobs that never crawl (cucchiaio) don't pay
+    for a browser, the same goes for the HTTP pool of static scrapers. Each scraper database is opened once and kept for the process, along with
+    the background writer that saves its crawl results. The optional page cache and the
+    retry policy (so per-host backoff and the retry budget) are shared by the crawler,
+    the fetcher and the jobs' own HTTP requests."""
+
+    def __init__(self, browser_config: Optional[BrowserConfig] = None, local: bool = True,
+                 page_cache: Optional[PageCache] = None, retry_policy: Optional[RetryPolicy] = None):
+        self.browser_config = browser_config or BrowserConfig()
+        self.local = local
+        self.page_cache = page_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._crawler: Optional[CrawlerWrapper] = None
+        self._crawler_lock = asyncio.Lock()
+        self._fetcher: Optional[StaticFetcher] = None
+        self._databases: Dict[Tuple[str, str, str], DatabaseHelper] = {}
+        self._writers: Dict[Tuple[str, str, str], WriteQueue] = {}
+
+    async def crawler(self) -> CrawlerWrapper:
+        """Return the shared crawler, starting it on first use"""
+        async with self._crawler_lock:
+            if self._crawler is None:
+                self._crawler = CrawlerWrapper(browser_config=self.browser_config, local=self.local,
+                                               page_cache=self.page_cache, retry_policy=self.retry_policy)
+            await self._crawler.start()
+            return self._crawler
+
+    async def fetcher(self) -> StaticFetcher:
+        """Return the shared browserless fetcher, opening its HTTP pool on first use"""
+        if self._fetcher is None:
+            self._fetcher = StaticFetcher(page_cache=self.page_cache, retry_policy=self.retry_policy)
+        await self._fetcher.start()
+        return self._fetcher
+
+    def database(self, db_directory: str, scraper_name: str, schema: Dict[str, Any]) -> DatabaseHelper:
+        """Return the open helper for a scraper table, creating the table on first use"""
+        key = (db_directory, scraper_name, schema.get("name", "scraped_data"))
+        if key not in self._databases:
+            db = DatabaseHelper(db_directory, scraper_name, schema)
+            db.create_table_from_schema()
+            self._databases[key] = db
+        return self._databases[key]
+
+    def writer(self, db_directory: str, scraper_name: str, schema: Dict[str, Any]) -> WriteQueue:
+        """Return the background writer for a scraper table, creating the table on first use"""
+        key = (db_directory, scraper_name, schema.get("name", "scraped_data"))
+        if key not in self._writers:
+            # The table is created here, the writer thread only inserts
+            self.database(db_directory, scraper_name, schema)
+            self._writers[key] = WriteQueue(db_directory, scraper_name, schema)
+        return self._writers[key]
+
+    async def close(self):
+        """Stop the crawler and the fetcher, write what is still queued and close every database"""
+        try:
+            if self._crawler is not None:
+                await self._crawler.close()
+            if self._fetcher is not None:
+                await self._fetcher.close()
+        finally:
+            self._crawler = None
+            self._fetcher = None
+            for writer in self._writers.values():
+                await writer.close()
+            self._writers = {}
+            for db in self._databases.values():
+                db.close()
+            self._databases = {}
+            if self.page_cache is not None:
+                self.page_cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
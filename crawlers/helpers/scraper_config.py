@@ -0,0 +1,262 @@
+import os
+import re
+import json
+import asyncio
+from collections import deque
+from pathlib import Path
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional
+from crawl4ai import BFSDeepCrawlStrategy, CrawlerRunConfig, DFSDeepCrawlStrategy
+from crawl4ai import JsonCssExtractionStrategy, JsonXPathExtractionStrategy
+from crawl4ai.deep_crawling.filters import DomainFilter, FilterChain, URLPatternFilter
+from helpers.db_helper import DatabaseHelper
+from helpers.resources import SharedResources
+from helpers.static_fetcher import follow_links
+from helpers.write_queue import PageRecord, WriteQueue
+
+# ${NAME} or ${NAME:-default}, the default can itself be a ${...} (innermost expanded first)
+ENV_PATTERN = re.compile(r"\$\{(\w+)(?::-([^${}]*))?\}")
+
+EXTRACTION_STRATEGIES = {
+    "css": JsonCssExtractionStrategy,
+    "xpath": JsonXPathExtractionStrategy,
+}
+# "browser" renders pages in Chromium, "static" fetches them over HTTP and extracts with lxml
+FETCHERS = ("browser", "static")
+DEEP_CRAWL_STRATEGIES = {
+    "bfs": BFSDeepCrawlStrategy,
+    "dfs": DFSDeepCrawlStrategy,
+}
+
+
+def expand_env(value: Any) -> Any:
+    """Replace ${NAME} and ${NAME:-default} in every string of a config with environment values"""
+    if isinstance(value, dict):
+        return {key: expand_env(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand_env(item) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    def replace(match: re.Match) -> str:
+        name, default = match.group(1), match.group(2)
+        env_value = os.getenv(name, default)
+        if not env_value and default is None:
+            raise ValueError(f"Please set the {name} environment variable.")
+        return env_value or ""
+
+    # One pass per nesting level
+    while ENV_PATTERN.search(value):
+        value = ENV_PATTERN.sub(replace, value)
+    return value
+
+
+class ConfigScraper:
+    """A scraper defined by a JSON config instead of a module.
+
+    The config gives the extraction schema (JsonCssExtractionStrategy format), the start
+    URLs, an optional deep crawl with its filters, the database to save into, the interval,
+    the fetcher (browser or static) and a concurrency budget: the pages of this scraper
+    that may be crawled at once.
+
+    With "incremental": true the deep crawl walks the pages one at a time in link order
+    and stops following links from a page whose items are all in the database already,
+    so a steady-state run only crawls the pages with new items. Page outcomes are kept
+    in the database, failed and unreached pages are crawled first on the next run.
+
+    It exposes the same run / scrape_interval / browser_options interface as the crawler
+    modules, so the scheduler runs both kinds of jobs side by side."""
+
+    def __init__(self, config: Dict[str, Any], local: bool = True):
+        self.name: str = config["name"]
+        self.db_path: str = config["db_path"]
+        self.database: str = config.get("database", self.name)
+        self.schema: Dict[str, Any] = config["schema"]
+        self.start_urls: List[str] = config["start_urls"]
+        self.scrape_interval = int(config.get("interval", 1800))
+        self.concurrency = int(config.get("concurrency", 5))
+        self.domain_delay = tuple(config.get("domain_delay", (1.0, 3.0)))
+        self.deep_crawl: Optional[Dict[str, Any]] = config.get("deep_crawl")
+        self.browser: Dict[str, Any] = config.get("browser", {})
+        self.fetcher: str = config.get("fetcher", "browser")
+        self.incremental = bool(config.get("incremental", False))
+        self.local = local
+
+        strategy = config.get("extraction", "css")
+        if strategy not in EXTRACTION_STRATEGIES:
+            raise ValueError(f"Unknown extraction strategy '{strategy}' in {self.name}, use one of {list(EXTRACTION_STRATEGIES)}")
+        self.extraction_class = EXTRACTION_STRATEGIES[strategy]
+        if self.deep_crawl and self.deep_crawl.get("strategy", "bfs") not in DEEP_CRAWL_STRATEGIES:
+            raise ValueError(f"Unknown deep crawl strategy in {self.name}, use one of {list(DEEP_CRAWL_STRATEGIES)}")
+        if self.fetcher not in FETCHERS:
+            raise ValueError(f"Unknown fetcher '{self.fetcher}' in {self.name}, use one of {list(FETCHERS)}")
+        if not self.start_urls:
+            raise ValueError(f"{self.name} has no start_urls")
+        if self.incremental:
+            primary_key = self.schema.get("primary_key", "id")
+            fields = self.schema.get("fields", []) + self.schema.get("baseFields", [])
+            if not self.deep_crawl or primary_key not in [field["name"] for field in fields]:
+                raise ValueError(f"Incremental crawls need a deep_crawl and the primary key '{primary_key}' in the schema of {self.name}")
+
+    def browser_options(self) -> Dict[str, Any]:
+        """BrowserConfig options this scraper needs, merged by the scheduler"""
+        if self.fetcher == "static":
+            return {}
+        return {"headless": not self.local, **self.browser}
+
+    def crawler_config(self) -> CrawlerRunConfig:
+        # A new config per crawl, deep crawl strategies keep per-crawl state (visited URLs, page counts)
+        deep_crawl_strategy = None
+        if self.deep_crawl:
+            filters = []
+            if self.deep_crawl.get("allowed_domains"):
+                filters.append(DomainFilter(allowed_domains=self.deep_crawl["allowed_domains"]))
+            if self.deep_crawl.get("url_patterns"):
+                filters.append(URLPatternFilter(patterns=self.deep_crawl["url_patterns"], use_glob=False))
+            deep_crawl_strategy = DEEP_CRAWL_STRATEGIES[self.deep_crawl.get("strategy", "bfs")](
+                max_depth=int(self.deep_crawl.get("max_depth", 3)),
+                max_pages=int(self.deep_crawl.get("max_pages", 100)),
+                include_external=bool(self.deep_crawl.get("include_external", False)),
+                filter_chain=FilterChain(filters),
+            )
+        return CrawlerRunConfig(
+            extraction_strategy=self.extraction_class(self.schema, verbose=True),
+            deep_crawl_strategy=deep_crawl_strategy,
+            # Pages of one deep crawl level fetched at once
+            semaphore_count=self.concurrency,
+        )
+
+    async def run(self, resources: SharedResources):
+        """One scrape, the job the scheduler runs every scrape_interval seconds"""
+        print(f"Starting {self.name} scraper...")
+        # Both backends take the same config and return the same extracted_content
+        crawler_wrapper: Any = await (resources.fetcher() if self.fetcher == "static" else resources.crawler())
+        crawler_config = self.crawler_config()
+        db = resources.database(self.db_path, self.database, self.schema)
+        writer = resources.writer(self.db_path, self.database, self.schema)
+        saved_before = writer.saved_count
+        counts_before = dict(writer.counts)
+
+        # Pages are parsed and saved in batches on the writer thread
+        try:
+            if self.incremental:
+                failed = await self._crawl_incremental(crawler_wrapper, crawler_config, db, writer)
+            else:
+                failed = await self._crawl_all(crawler_wrapper, crawler_config, writer)
+        finally:
+            await writer.flush()
+
+        counts = {outcome: count - counts_before[outcome] for outcome, count in writer.counts.items()}
+        print(f"Saved {writer.saved_count - saved_before} items to database at {db.db_path}: "
+              f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
+              + (f", {failed} pages failed" if failed else ""))
+        print(f"Total items in database: {db.count()}")
+        print(f"{self.name.capitalize()} scraper completed.")
+
+    async def _crawl_all(self, crawler_wrapper: Any, crawler_config: CrawlerRunConfig, writer: WriteQueue) -> int:
+        """Crawl every page, returns the number of failed pages"""
+        failed = 0
+        if self.deep_crawl:
+            # Each deep crawl already fetches `concurrency` pages at once. Every start URL
+            # gets its own strategy, a shared one would carry over the previous URL's
+            # visited pages and max_pages count
+            results = []
+            for index, url in enumerate(self.start_urls):
+                config = crawler_config if index == 0 else self.crawler_config()
+                results.extend(await crawler_wrapper.crawl(url, config))
+            pages: Any = _iterate(results)
+        else:
+            pages = crawler_wrapper.crawl_many(self.start_urls, crawler_config, concurrency=self.concurrency,
+                                               domain_delay=self.domain_delay)
+        async for result in pages:
+            if not result.success:
+                failed += 1
+                print(f"✗ Failed to crawl {result.url}: {result.error_message}")
+                continue
+
+            if result.extracted_content:
+                await writer.put(result.extracted_content)
+            else:
+                print(f"No content extracted from {result.url}")
+        return failed
+
+    async def _crawl_incremental(self, crawler_wrapper: Any, crawler_config: CrawlerRunConfig, db: DatabaseHelper,
+                                 writer: WriteQueue) -> int:
+        """Crawl page by page until only known items are found, returns the number of failed pages"""
+        deep_crawl_strategy = crawler_config.deep_crawl_strategy
+        page_config = crawler_config.clone(deep_crawl_strategy=None)
+        max_pages = getattr(deep_crawl_strategy, "max_pages", float("inf"))
+        db.create_crawl_pages_table()
+        known = db.get_keys()
+
+        # Pages left over by the previous run come after the start URLs
+        frontier = deque(self.start_urls)
+        frontier.extend(url for url in db.pages_to_retry() if url not in self.start_urls)
+        visited = set(frontier)
+        crawled = failed = 0
+        while frontier and crawled < max_pages:
+            url = frontier.popleft()
+            result = (await crawler_wrapper.crawl(url, page_config))[0]
+            crawled += 1
+            if not result.success:
+                failed += 1
+                print(f"✗ Failed to crawl {url}: {result.error_message}")
+                await writer.put_page(PageRecord(url, "failed", error=result.error_message))
+                continue
+
+            try:
+                # Parsed off the event loop, the keys decide whether to go on
+                items = await asyncio.to_thread(json.loads, result.extracted_content or "[]")
+            except json.JSONDecodeError as e:
+                failed += 1
+                print(f"✗ Failed to parse extracted content of {url}: {e}")
+                await writer.put_page(PageRecord(url, "failed", error=str(e)))
+                continue
+            keys = {item.get(db.primary_key) for item in items} - {None, ""}
+            new_keys = keys - known
+            known |= keys
+            if items:
+                await writer.put(items)
+
+            if not items:
+                status = "empty"
+            elif not new_keys:
+                # Everything past this page was crawled before
+                status = "known"
+            else:
+                status = "new"
+                links = await follow_links(result, deep_crawl_strategy, 1, urlsplit(url).hostname, visited)
+                for link in links:
+                    # Recorded before they are crawled, an interrupted run resumes from them
+                    await writer.put_page(PageRecord(link, "pending"))
+                frontier.extend(links)
+            # Written by the writer thread once the page's items are saved, a crash in between
+            # leaves the page to be crawled again rather than its posts missing
+            await writer.put_page(PageRecord(url, status, items=len(items), new_items=len(new_keys)))
+
+        print(f"Crawled {crawled} pages, {len(frontier)} left for the next run" if frontier else f"Crawled {crawled} pages")
+        return failed
+
+
+async def _iterate(results: List[Any]):
+    for result in results:
+        yield result
+
+
+def load_config(path: str, local: bool = True) -> ConfigScraper:
+    """Read a scraper config, expanding environment variables"""
+    with open(path) as f:
+        config = json.load(f)
+    config.setdefault("name", Path(path).stem)
+    return ConfigScraper(expand_env(config), local=local)
+
+
+def config_path(directory: str, name: str) -> Optional[str]:
+    """The config file of a scraper, None when it is a module"""
+    path = Path(directory) / f"{name}.json"
+    return str(path) if path.is_file() else None
+
+
+def config_names(directory: str) -> List[str]:
+    """Names of every scraper config in a directory"""
+    return sorted(path.stem for path in Path(directory).glob("*.json"))
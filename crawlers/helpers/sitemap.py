@@ -0,0 +1,223 @@
+import asyncio
+import sqlite3
+import xml.etree.ElementTree as ET
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from helpers.crawler_wrapper import fetched_bytes
+from helpers.resilience import RetryPolicy
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag"""
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapReader:
+    """Streams the <url> entries of a sitemap or sitemap index.
+
+    Sitemaps are parsed incrementally while they download. Their ETag/Last-Modified
+    validators, the <lastmod> of child sitemaps and the URLs each sitemap listed are
+    kept in the scraper database, so an unchanged sitemap costs a 304 (or no request
+    at all when its index <lastmod> did not move) and is replayed from there. A sitemap
+    index that answers 304 is taken to mean none of its children changed either.
+
+    The <lastmod> of each URL is stored only so replayed entries carry it, it is not
+    compared to skip entries: every URL is yielded, so the caller can stage all its keys
+    for DatabaseHelper.finish_sync, and the content hash there already leaves unchanged
+    rows alone.
+
+    Requests that time out, lose their connection or get a 429/5xx answer are retried
+    with the retry policy's backoff. A download failing midway is not, the stream has
+    already been partly consumed."""
+
+    def __init__(self, session: aiohttp.ClientSession, conn: sqlite3.Connection,
+                 concurrency: int = 4, chunk_size: int = 64 * 1024, retry_policy: Optional[RetryPolicy] = None):
+        self.session = session
+        self.conn = conn
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.chunk_size = chunk_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.not_modified = False  # The root sitemap answered 304
+        self.stats = {"fetched": 0, "not_modified": 0, "skipped": 0}
+        # Validators of the sitemaps fetched in this run, written by save_state
+        self._pending_state: Dict[str, Tuple[Optional[str], Optional[str], Optional[str]]] = {}
+
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS _sitemap_state (
+            url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, lastmod TEXT
+        )
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS _sitemap_urls (
+            loc TEXT PRIMARY KEY, sitemap TEXT, lastmod TEXT
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS _sitemap_urls_sitemap ON _sitemap_urls (sitemap)")
+        self.conn.commit()
+
+    async def iter_urls(self, url: str) -> AsyncIterator[Dict[str, Optional[str]]]:
+        """Yield {"loc", "lastmod"} for every URL listed by the sitemap, following sitemap indexes"""
+        self.not_modified = False
+        response = await self._conditional_get(url)
+        if response is None:
+            self.not_modified = True
+            return
+
+        children: List[Tuple[str, Optional[str]]] = []
+        async with response:
+            self._begin_sitemap(url)
+            batch: List[Tuple[str, str, Optional[str]]] = []
+            async for kind, loc, lastmod in self._parse(response):
+                if kind == "sitemap":
+                    children.append((loc, lastmod))
+                    continue
+                batch.append((loc, url, lastmod))
+                if len(batch) >= 500:
+                    self._store_urls(batch)
+                    batch = []
+                yield {"loc": loc, "lastmod": lastmod}
+            self._store_urls(batch)
+            self._pending_state[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"), None)
+
+        if not children:
+            return
+
+        # Child sitemaps are fetched concurrently and funneled through one queue
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        tasks = [asyncio.create_task(self._read_child(queue, loc, lastmod)) for loc, lastmod in children]
+        try:
+            pending = len(tasks)
+            while pending:
+                entry = await queue.get()
+                if entry is None:
+                    pending -= 1
+                    continue
+                yield entry
+            # Surface errors raised by the children
+            for task in tasks:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def save_state(self):
+        """Persist the validators of this run, call once the entries have been stored"""
+        self.conn.executemany("""
+        INSERT OR REPLACE INTO _sitemap_state (url, etag, last_modified, lastmod) VALUES (?, ?, ?, ?)
+        """, [(url, *state) for url, state in self._pending_state.items()])
+        self.conn.commit()
+        self._pending_state = {}
+
+    async def _read_child(self, queue: asyncio.Queue, url: str, lastmod: Optional[str]):
+        try:
+            async with self.semaphore:
+                stored = self.conn.execute(
+                    "SELECT etag, last_modified, lastmod FROM _sitemap_state WHERE url = ?", (url,)
+                ).fetchone()
+
+                # The index says this sitemap didn't change since the last run, skip the request
+                if stored and lastmod and stored[2] == lastmod:
+                    self.stats["skipped"] += 1
+                    await self._replay(queue, url)
+                    return
+
+                response = await self._conditional_get(url)
+                if response is None:
+                    self._pending_state[url] = (stored[0], stored[1], lastmod)
+                    await self._replay(queue, url)
+                    return
+
+                async with response:
+                    self._begin_sitemap(url)
+                    batch: List[Tuple[str, str, Optional[str]]] = []
+                    async for kind, loc, url_lastmod in self._parse(response):
+                        if kind != "url":
+                            continue
+                        batch.append((loc, url, url_lastmod))
+                        if len(batch) >= 500:
+                            self._store_urls(batch)
+                            batch = []
+                        await queue.put({"loc": loc, "lastmod": url_lastmod})
+                    self._store_urls(batch)
+                    self._pending_state[url] = (
+                        response.headers.get("ETag"), response.headers.get("Last-Modified"), lastmod
+                    )
+        finally:
+            await queue.put(None)
+
+    async def _replay(self, queue: asyncio.Queue, url: str):
+        """Emit the URLs an unchanged sitemap listed on its last download"""
+        rows = self.conn.execute("SELECT loc, lastmod FROM _sitemap_urls WHERE sitemap = ?", (url,)).fetchall()
+        for loc, lastmod in rows:
+            await queue.put({"loc": loc, "lastmod": lastmod})
+
+    async def _conditional_get(self, url: str) -> Optional[aiohttp.ClientResponse]:
+        """GET a sitemap with the stored validators, None when it was not modified"""
+        stored = self.conn.execute(
+            "SELECT etag, last_modified FROM _sitemap_state WHERE url = ?", (url,)
+        ).fetchone()
+        headers = {}
+        if stored and stored[0]:
+            headers["If-None-Match"] = stored[0]
+        if stored and stored[1]:
+            headers["If-Modified-Since"] = stored[1]
+
+        async def get() -> aiohttp.ClientResponse:
+            response = await self.session.get(url, headers=headers)
+            if response.status not in (200, 304):
+                response.release()
+                # Carries the status, so the retry policy can tell a 503 from a 404
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status,
+                    message=f"Failed to fetch sitemap {url}: HTTP {response.status}", headers=response.headers,
+                )
+            return response
+
+        response = await self.retry_policy.call(url, get)
+        if response.status == 304:
+            response.release()
+            self.stats["not_modified"] += 1
+            return None
+        self.stats["fetched"] += 1
+        return response
+
+    async def _parse(self, response: aiohttp.ClientResponse) -> AsyncIterator[Tuple[str, str, Optional[str]]]:
+        """Parse a sitemap while it downloads, yielding ("url" | "sitemap", loc, lastmod)"""
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root = None
+        host = urlsplit(str(response.url)).hostname or ""
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            fetched_bytes.inc(len(chunk), host=host)
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+                kind = _local_name(elem.tag)
+                if kind not in ("url", "sitemap"):
+                    continue
+                values: Dict[str, Any] = {_local_name(child.tag): (child.text or "").strip() for child in elem}
+                # Drop parsed entries so memory doesn't grow with the sitemap
+                root.clear()
+                if values.get("loc"):
+                    yield kind, values["loc"], values.get("lastmod") or None
+        parser.close()
+
+    def _begin_sitemap(self, url: str):
+        """Forget what a sitemap listed and its validators until it is fully read again.
+        Commits at once, the connection is shared with the scraper's writes and an open
+        transaction would hold the write lock for as long as the sitemap streams in."""
+        with self.conn:
+            self.conn.execute("DELETE FROM _sitemap_urls WHERE sitemap = ?", (url,))
+            self.conn.execute("DELETE FROM _sitemap_state WHERE url = ?", (url,))
+
+    def _store_urls(self, batch: List[Tuple[str, str, Optional[str]]]):
+        """Record (loc, sitemap, lastmod) rows, committed at once like _begin_sitemap"""
+        if batch:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO _sitemap_urls (loc, sitemap, lastmod) VALUES (?, ?, ?)", batch
+                )
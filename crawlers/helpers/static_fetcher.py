@@ -0,0 +1,253 @@
+import json
+import time
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+import aiohttp
+from lxml import etree, html as lxml_html
+from crawl4ai import CrawlResult, CrawlerRunConfig, JsonCssExtractionStrategy, JsonLxmlExtractionStrategy, RateLimiter
+from helpers.crawler_wrapper import crawl_seconds, extraction_seconds, record_result
+from helpers.page_cache import PageCache, cache_requests
+from helpers.resilience import RETRYABLE_STATUSES, RetryPolicy, retry_after
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+
+
+class LxmlCssExtractionStrategy(JsonLxmlExtractionStrategy):
+    """JsonCssExtractionStrategy schemas evaluated with lxml and cached compiled selectors.
+
+    Text fields are joined like BeautifulSoup's get_text(strip=True), so a schema extracts
+    the same values as on the browser path."""
+
+    def _get_element_text(self, element) -> str:
+        return "".join(text.strip() for text in element.xpath(".//text()"))
+
+
+def lxml_strategy(crawler_config: CrawlerRunConfig):
+    """The config's extraction strategy, CSS schemas switched to the lxml evaluator"""
+    strategy = crawler_config.extraction_strategy
+    if isinstance(strategy, JsonCssExtractionStrategy):
+        # Same schema and output, without building a BeautifulSoup tree per page
+        return LxmlCssExtractionStrategy(strategy.schema, verbose=strategy.verbose)
+    return strategy
+
+
+def page_links(base_url: str, html: str) -> List[str]:
+    """Absolute http(s) links of a page, without fragments, in document order"""
+    links = []
+    for href in lxml_html.fromstring(html).xpath("//a/@href"):
+        url = urldefrag(urljoin(base_url, href.strip()))[0]
+        if url.startswith(("http://", "https://")):
+            links.append(url)
+    return links
+
+
+async def follow_links(result: CrawlResult, deep_crawl_strategy, depth: int, start_host: Optional[str],
+                       visited: Set[str]) -> List[str]:
+    """Links of a crawled page a deep crawl should visit next, with the same rules as the
+    browser deep crawl: URL validation, domain scope and filter chain. Adds them to visited."""
+    if not result.success or not result.html.strip():
+        return []
+    try:
+        # Parsing is CPU bound, off the event loop like the extraction
+        page_urls = await asyncio.to_thread(page_links, result.url, result.html)
+    except (ValueError, etree.LxmlError) as e:
+        print(f"✗ Could not parse links of {result.url}: {e}")
+        return []
+    include_external = getattr(deep_crawl_strategy, "include_external", False)
+    links = []
+    for link in page_urls:
+        if link in visited:
+            continue
+        if not include_external and urlsplit(link).hostname != start_host:
+            continue
+        visited.add(link)
+        if await deep_crawl_strategy.can_process_url(link, depth):
+            links.append(link)
+    return links
+
+
+class StaticFetcher:
+    """Browserless crawling for pages that need no JavaScript.
+
+    Pages are fetched over one pooled aiohttp session and the extraction schema is applied
+    to the raw HTML, so results carry the same extracted_content as a browser crawl of the
+    same page. crawl and crawl_many mirror CrawlerWrapper, deep crawl strategies included
+    (their depth, page limit and filter chain drive a breadth-first crawl here).
+
+    With a page cache, fresh pages are served without a request and stale ones are
+    revalidated with a conditional GET. A 304, or a body identical to the cached one,
+    reuses the cached extraction.
+
+    Timeouts, dropped connections, 429 and 5xx answers are retried with the retry
+    policy's per-host backoff and budget."""
+
+    def __init__(self, concurrency: int = 10, timeout: float = 30, page_cache: Optional[PageCache] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.page_cache = page_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        """Open the HTTP session, no-op when already open"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=DEFAULT_HEADERS,
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def fetch(self, url: str, extraction_strategy=None) -> CrawlResult:
+        """Fetch one page and apply the extraction strategy, errors become failed results"""
+        await self.start()
+        assert self.session is not None
+        host = urlsplit(url).hostname or ""
+        started = time.perf_counter()
+
+        cached = None
+        if self.page_cache is not None:
+            cache_key = self.page_cache.key(url, {
+                "extraction": type(extraction_strategy).__name__,
+                "schema": getattr(extraction_strategy, "schema", None),
+            })
+            cached = self.page_cache.get(cache_key)
+            if cached is not None and cached.fresh:
+                cache_requests.inc(outcome="hit")
+                cached.result.cache_status = "hit"
+                record_result(cached.result)
+                return cached.result
+
+        try:
+            request_headers = cached.conditional_headers() if cached is not None else {}
+            body, status, headers, final_url = await self.retry_policy.call(
+                url,
+                lambda: self._get(url, request_headers),
+                retryable_result=lambda response: response[1] in RETRYABLE_STATUSES,
+                result_delay=lambda response: retry_after(response[2]),
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result = CrawlResult(url=url, html="", success=False, error_message=f"Fetch failed: {e!r}")
+            record_result(result)
+            return result
+
+        if cached is not None and (status == 304 or (status == 200 and body == cached.result.html)):
+            # Unchanged since it was cached (per the server or byte for byte), skip the extraction
+            assert self.page_cache is not None
+            if status == 304:
+                self.page_cache.refresh(cached.key)
+            else:
+                # Keep the new validators the server sent
+                cached.result.response_headers = headers
+                self.page_cache.put(cached.key, cached.result)
+            cache_requests.inc(outcome="revalidated" if status == 304 else "unchanged")
+            cached.result.cache_status = "hit_validated"
+            crawl_seconds.observe(time.perf_counter() - started, host=host)
+            record_result(cached.result)
+            return cached.result
+
+        result = CrawlResult(
+            url=url,
+            html=body,
+            success=status < 400,
+            status_code=status,
+            response_headers=headers,
+            redirected_url=final_url if final_url != url else None,
+            error_message=None if status < 400 else f"HTTP {status}",
+        )
+        if result.success and extraction_strategy is not None:
+            with extraction_seconds.time(strategy=type(extraction_strategy).__name__):
+                # Parsing is CPU bound, keep it off the event loop like the browser path does
+                extracted = await asyncio.to_thread(extraction_strategy.run, url, [body])
+            result.extracted_content = json.dumps(extracted, indent=4, default=str, ensure_ascii=False)
+        if self.page_cache is not None:
+            cache_requests.inc(outcome="miss")
+            result.cache_status = "miss"
+            self.page_cache.put(cache_key, result)
+        crawl_seconds.observe(time.perf_counter() - started, host=host)
+        record_result(result)
+        return result
+
+    async def _get(self, url: str, request_headers: Dict[str, str]) -> Tuple[str, int, Dict[str, str], str]:
+        """One GET: body, status, headers and final URL"""
+        assert self.session is not None
+        async with self.session.get(url, headers=request_headers) as response:
+            body = await response.text(errors="replace")
+            return body, response.status, dict(response.headers), str(response.url)
+
+    async def crawl(self, url: str, crawler_config: CrawlerRunConfig) -> List[CrawlResult]:
+        """Crawl a URL, following links when the config has a deep crawl strategy"""
+        strategy = lxml_strategy(crawler_config)
+        if crawler_config.deep_crawl_strategy is None:
+            return [await self.fetch(url, strategy)]
+        return await self._deep_crawl(url, crawler_config, strategy)
+
+    async def crawl_many(self, urls: List[str], crawler_config: CrawlerRunConfig, concurrency: int = 5,
+                         domain_delay: Tuple[float, float] = (1.0, 3.0), batch_size: int = 10) -> AsyncIterator[CrawlResult]:
+        """Fetch several URLs with at most `concurrency` in flight, yielding results as they complete.
+        batch_size is accepted for CrawlerWrapper compatibility, every URL is its own request here."""
+        strategy = lxml_strategy(crawler_config)
+        rate_limiter = RateLimiter(base_delay=domain_delay)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(url: str) -> CrawlResult:
+            async with semaphore:
+                await rate_limiter.wait_if_needed(url)
+                result = await self.fetch(url, strategy)
+                if result.status_code:
+                    rate_limiter.update_delay(url, result.status_code)
+                return result
+
+        tasks = [asyncio.create_task(fetch(url)) for url in urls]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _deep_crawl(self, start_url: str, crawler_config: CrawlerRunConfig, strategy) -> List[CrawlResult]:
+        deep = crawler_config.deep_crawl_strategy
+        max_depth = getattr(deep, "max_depth", 0)
+        max_pages = getattr(deep, "max_pages", float("inf"))
+        semaphore = asyncio.Semaphore(crawler_config.semaphore_count or self.concurrency)
+        start_host = urlsplit(start_url).hostname
+
+        async def fetch(url: str) -> CrawlResult:
+            async with semaphore:
+                return await self.fetch(url, strategy)
+
+        results: List[CrawlResult] = []
+        visited: Set[str] = {start_url}
+        level = [start_url]
+        depth = 0
+        while level and len(results) < max_pages:
+            if max_pages != float("inf"):
+                level = level[:int(max_pages) - len(results)]
+            level_results = await asyncio.gather(*(fetch(url) for url in level))
+            results.extend(level_results)
+            if depth >= max_depth:
+                break
+
+            next_level = []
+            for result in level_results:
+                next_level.extend(await follow_links(result, deep, depth + 1, start_host, visited))
+            level = next_level
+            depth += 1
+        return results
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,178 @@
+import json
+import time
+import queue
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Union
+from helpers.db_helper import DatabaseHelper
+
+# Queued by close() to stop the writer thread once everything before it is saved
+_STOP = object()
+# Queued by flush() so the writer commits its batch at once instead of lingering
+_FLUSH = object()
+
+
+class PageRecord:
+    """Outcome of an incremental crawl page, written once the rows queued before it are saved"""
+
+    def __init__(self, url: str, status: str, items: int = 0, new_items: int = 0, error: Optional[str] = None):
+        self.url = url
+        self.status = status
+        self.items = items
+        self.new_items = new_items
+        self.error = error
+
+
+class WriteQueue:
+    """Saves extracted rows on a dedicated writer thread so commits don't block the event loop.
+
+    put() takes a crawl result's extracted_content (parsed on the writer thread) or a list
+    of rows. The thread drains the queue into batches of up to batch_size rows, waiting at
+    most linger seconds for a batch to fill, and writes each batch in one transaction on its
+    own connection. put() waits when maxsize items are pending. The table must already exist.
+
+    put_page() queues a PageRecord behind the page's rows, it is only recorded as crawled
+    once they are saved (as failed when a write failed in between)."""
+
+    def __init__(self, db_directory: str, scraper_name: str, schema: Dict[str, Any],
+                 maxsize: int = 1000, batch_size: int = 500, linger: float = 0.5):
+        self.db_directory = db_directory
+        self.scraper_name = scraper_name
+        self.schema = schema
+        self.batch_size = batch_size
+        self.linger = linger
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.thread = threading.Thread(target=self._run, name=f"writer-{scraper_name}", daemon=True)
+        self.saved_count = 0  # Rows saved since the queue started
+        self.failed_count = 0  # Items that could not be parsed or written
+        self.counts = {"inserted": 0, "updated": 0, "unchanged": 0}  # Saved rows by outcome
+        self.error: Optional[BaseException] = None  # What stopped the writer thread, raised by put and flush
+
+    def start(self):
+        """Start the writer thread, no-op when already running"""
+        if not self.thread.is_alive():
+            self.thread.start()
+
+    async def put(self, item: Union[str, List[Dict[str, Any]]]):
+        """Queue extracted JSON or rows for saving, waits while the queue is full"""
+        self._raise_error()
+        self.start()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            await asyncio.to_thread(self._blocking_put, item)
+            self._raise_error()
+
+    async def put_page(self, record: PageRecord):
+        """Queue the outcome of a crawled page, the crawl pages table must already exist"""
+        await self.put(record)
+
+    async def flush(self):
+        """Wait until everything queued so far has been written"""
+        self._raise_error()
+        if self.thread.is_alive():
+            await self.put(_FLUSH)
+            await asyncio.to_thread(self._join)
+        self._raise_error()
+
+    async def close(self):
+        """Write what is still queued and stop the writer thread"""
+        if self.thread.is_alive():
+            await asyncio.to_thread(self.queue.put, _STOP)
+            await asyncio.to_thread(self.thread.join)
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise RuntimeError(f"Writer thread of {self.scraper_name} stopped: {self.error!r}") from self.error
+
+    # queue.put and queue.join would wait forever on a writer thread that died, these give up with it
+    def _blocking_put(self, item: Any):
+        while self.thread.is_alive():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _join(self):
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks and self.thread.is_alive():
+                self.queue.all_tasks_done.wait(0.5)
+
+    def _run(self):
+        try:
+            self._write_loop()
+        except BaseException as e:
+            self.error = e
+            print(f"✗ Writer thread of {self.scraper_name} stopped: {e!r}")
+
+    def _write_loop(self):
+        db = DatabaseHelper(self.db_directory, self.scraper_name, self.schema, batch_size=self.batch_size)
+        try:
+            stopping = False
+            # A write failed since the last page records, their rows may be missing
+            unsaved = False
+            while not stopping:
+                flushing = False
+                items = [self.queue.get()]
+                rows: List[Dict[str, Any]] = []
+                records: List[PageRecord] = []
+                deadline = time.monotonic() + self.linger
+
+                # Coalesce whatever arrives within linger seconds into one transaction
+                while True:
+                    item = items[-1]
+                    if item is _STOP:
+                        stopping = True
+                    elif item is _FLUSH:
+                        flushing = True
+                    elif isinstance(item, PageRecord):
+                        records.append(item)
+                    else:
+                        rows.extend(self._parse(item))
+                    if stopping or flushing or len(rows) >= self.batch_size:
+                        break
+                    timeout = deadline - time.monotonic()
+                    try:
+                        items.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                try:
+                    if rows:
+                        self.saved_count += db.save_data(rows)
+                        for outcome, count in db.last_counts.items():
+                            self.counts[outcome] += count
+                except Exception as e:
+                    unsaved = True
+                    self.failed_count += len(rows)
+                    print(f"✗ Failed to save {len(rows)} rows: {e}")
+                try:
+                    if records:
+                        self._record_pages(db, records, unsaved)
+                        unsaved = False
+                except Exception as e:
+                    print(f"✗ Failed to record {len(records)} crawled pages: {e}")
+                finally:
+                    for _ in items:
+                        self.queue.task_done()
+        finally:
+            db.close()
+
+    def _record_pages(self, db: DatabaseHelper, records: List[PageRecord], unsaved: bool):
+        for record in records:
+            if unsaved and record.items:
+                db.record_page(record.url, "failed", error="Saving the items failed")
+            else:
+                db.record_page(record.url, record.status, record.items, record.new_items, record.error)
+
+    def _parse(self, item: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        if not isinstance(item, str):
+            return item
+        try:
+            data = json.loads(item)
+        except json.JSONDecodeError as e:
+            self.failed_count += 1
+            print(f"✗ Failed to parse extracted content: {e}")
+            return []
+        return data if isinstance(data, list) else [data]
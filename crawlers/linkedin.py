@@ -1,13 +1,15 @@
 import json
 import asyncio
 import os
-import time
 import random
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from dotenv import load_dotenv
 from crawl4ai import BrowserConfig, CrawlerRunConfig, CacheMode
 from crawl4ai import JsonCssExtractionStrategy
-from helpers.crawler_wrapper import CrawlerWrapper
-from helpers.db_helper import DatabaseHelper
+from helpers.metrics import start_exporter
+from helpers.resilience import run_forever
+from helpers.resources import SharedResources
 
 # Load environment variables
 load_dotenv()
@@ -16,12 +18,18 @@ local = os.getenv("LOCAL", "")
 db_path = os.getenv("DB_PATH", "")
 state_directory = os.getenv("STATE_DIRECTORY", "")
 initial_url = os.getenv("LINKEDIN_URL", "")
-scrape_interval = os.getenv("SCRAPE_INTERVAL", "3600")
+scrape_interval = os.getenv("LINKEDIN_SCRAPE_INTERVAL", os.getenv("SCRAPE_INTERVAL", "3600"))
+metrics_port = os.getenv("METRICS_PORT", "")  # Serve /metrics on this port when set
+# Stop once this many jobs in a row are already in the database, "false" crawls everything
+incremental = os.getenv("LINKEDIN_INCREMENTAL", "true")
+known_streak_limit = os.getenv("LINKEDIN_KNOWN_STREAK", "25")
+
+JOBS_PER_PAGE = 25  # LinkedIn search results per page, the step of the start= parameter
 
 if not local or not initial_url or not db_path or not state_directory:
     raise ValueError("Please set required environment variables.")
 
-async def extract_linkedin_jobs():
+async def extract_linkedin_jobs(resources: SharedResources):
     schema = {
         "name": "linkedin_jobs",
         "baseSelector": "body",
@@ -77,54 +85,128 @@ async def extract_linkedin_jobs():
       }
     """
 
+    crawler_wrapper = await resources.crawler()
+    db = resources.database(db_path, "linkedin", schema)
+    writer = resources.writer(db_path, "linkedin", schema)
+    saved_before = writer.saved_count
+    counts_before = dict(writer.counts)
+    
+    known_ids = db.get_keys() if incremental == "true" else set()
+    known_streak = 0
+    
+    # An interrupted run resumes from the results page it had reached
+    checkpoint_file = os.path.join(state_directory, "linkedin-checkpoint.json")
+    checkpoint = load_checkpoint(checkpoint_file)
+    first_index = 0
+    if checkpoint and checkpoint.get("url") == initial_url:
+        first_index = checkpoint["position"] - checkpoint["position"] % JOBS_PER_PAGE
+        print(f"Resuming from job {first_index}")
+    start_url = with_start(initial_url, first_index)
+    
+    # One job per iteration, saved on the writer thread while the browser moves to the next one
+    try:
+        for index in range(first_index, 1000):
+        
+            crawler_config = CrawlerRunConfig(
+                js_only=True if index > first_index else False,
+                extraction_strategy=extraction_strategy,
+                cache_mode=CacheMode.BYPASS,
+                js_code=js_click_next_job if index > first_index else "",
+                session_id="linkedin-jobs-session",
+                wait_for="js:() => !document.querySelector('.artdeco-loader__bars')",
+                delay_before_return_html=random.uniform(1, 3),
+            )
+
+            results = await crawler_wrapper.crawl(start_url, crawler_config)
+
+            for result in results:
+                if not result.success:
+                    # The session can't go on. Raised so the run counts as failed and a transient
+                    # error (timeout, dropped connection) is retried soon, from the last checkpoint
+                    raise RuntimeError(f"Failed to crawl job {index}: {result.error_message}")
+            
+                if result.extracted_content:
+                    # Parsed off the event loop like the writer does, the ids decide what is queued
+                    jobs = await asyncio.to_thread(json.loads, result.extracted_content)
+                    new_jobs = [job for job in jobs if job.get("id") not in known_ids]
+                    # A repeated id (the click didn't move on) also counts as known
+                    known_ids.update(job.get("id") for job in jobs)
+                    known_streak = 0 if new_jobs else known_streak + 1
+                    if new_jobs:
+                        await writer.put(new_jobs)
+            
+            if incremental == "true" and known_streak >= int(known_streak_limit):
+                print(f"Stopping after {known_streak} already known jobs in a row")
+                break
+            
+            if index % JOBS_PER_PAGE == JOBS_PER_PAGE - 1:
+                # The checkpoint never gets ahead of the saved jobs, a resumed run doesn't skip any
+                await writer.flush()
+                save_checkpoint(checkpoint_file, index + 1)
+        
+        # Finished (or caught up), the next run starts from the top again
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+    finally:
+        await writer.flush()
+
+    counts = {outcome: count - counts_before[outcome] for outcome, count in writer.counts.items()}
+    print(f"Saved {writer.saved_count - saved_before} items to database at {db.db_path}: "
+          f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    print(f"Total items in database: {db.count()}")
+
+def with_start(url: str, start: int) -> str:
+    """Set the start= (result offset) parameter of a LinkedIn search URL"""
+    if not start:
+        return url
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != "start"]
+    query.append(("start", str(start)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def load_checkpoint(checkpoint_file: str) -> Optional[Dict[str, Any]]:
+    """Read the progress of an interrupted run, None when there is none"""
+    try:
+        with open(checkpoint_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(checkpoint_file: str, position: int):
+    """Record how many jobs of the search the run got through"""
+    # Written to a temp file and renamed, a crash never leaves a half-written checkpoint
+    temp_file = f"{checkpoint_file}.tmp"
+    with open(temp_file, "w") as f:
+        json.dump({"url": initial_url, "position": position}, f)
+    os.replace(temp_file, checkpoint_file)
+
+def browser_options() -> Dict[str, Any]:
+    """BrowserConfig options this scraper needs, merged by the scheduler"""
     state_file = os.path.join(state_directory, "linkedin-pinkynrg.json")
     
     with open(state_file, "r") as f:
         storage_state_dict = json.load(f)
     
-    browser_config = BrowserConfig(
-        headless=(local != "true"),
-        viewport_width=1920,
-        viewport_height=1080,
-        storage_state=storage_state_dict,
-    )
-
-    # Initialize the crawler wrapper once
-    crawler_wrapper = CrawlerWrapper(
-        browser_config=browser_config,
-        local=local == "true",
-    )
-
-    for index in range(1000):
-        
-        crawler_config = CrawlerRunConfig(
-            js_only=True if index > 0 else False,
-            extraction_strategy=extraction_strategy,
-            cache_mode=CacheMode.BYPASS,
-            js_code=js_click_next_job if index > 0 else "",
-            session_id="linkedin-jobs-session",
-            wait_for="js:() => !document.querySelector('.artdeco-loader__bars')",
-            delay_before_return_html=random.uniform(1, 3),
-        )
-
-        results = await crawler_wrapper.crawl(initial_url, crawler_config)
-
-        for result in results:
-            if not result.success:
-                print(f"✗ Failed to crawl: {result.error_message}")
-                return
-            
-            if result.extracted_content:
-                data = json.loads(result.extracted_content)
-                with DatabaseHelper(db_path, "linkedin", schema) as db:
-                    db.create_table_from_schema()
-                    inserted_count = db.save_data(data)
-                    all_data = db.get_all_data()
-                    print(f"Saved {inserted_count} items to database at {db.db_path}")
-                    print(f"Total items in database: {len(all_data)}")
-
-while True:
+    return {
+        "headless": local != "true",
+        "viewport_width": 1920,
+        "viewport_height": 1080,
+        "storage_state": storage_state_dict,
+    }
+
+async def run(resources: SharedResources):
+    """One scrape, the job the scheduler runs every scrape_interval seconds"""
     print("Starting LinkedIn scraper...")
-    asyncio.run(extract_linkedin_jobs())
-    print(f"LinkedIn scraper completed. Sleeping for {scrape_interval} seconds...")
-    time.sleep(int(scrape_interval))
\ No newline at end of file
+    await extract_linkedin_jobs(resources)
+    print("LinkedIn scraper completed.")
+
+async def main():
+    if metrics_port:
+        start_exporter(int(metrics_port))
+    
+    # The browser stays up between runs and is only restarted when it stops responding
+    async with SharedResources(BrowserConfig(**browser_options()), local=local == "true") as resources:
+        await run_forever(lambda: run(resources), int(scrape_interval), "LinkedIn scraper")
+
+if __name__ == "__main__":
+    asyncio.run(main())
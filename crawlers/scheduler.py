@@ -0,0 +1,137 @@
+import os
+import time
+import random
+import asyncio
+import importlib
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from crawl4ai import BrowserConfig
+from helpers.metrics import histogram, start_exporter
+from helpers.page_cache import open_page_cache
+from helpers.resilience import run_forever
+from helpers.resources import SharedResources
+from helpers.scraper_config import config_names, config_path, load_config
+
+# Load environment variables
+load_dotenv()
+
+local = os.getenv("LOCAL", "")
+# Scraper config names or crawler module names, "*" adds every config in the config directory
+job_names = os.getenv("SCHEDULER_JOBS", "blog,linkedin,cucchiaio")
+config_directory = os.getenv("SCHEDULER_CONFIG_DIRECTORY", str(Path(__file__).resolve().parent / "configs"))
+max_concurrent_jobs = os.getenv("SCHEDULER_MAX_CONCURRENT_JOBS", "2")
+jitter = os.getenv("SCHEDULER_JITTER", "60")  # Max random delay added to every run, in seconds
+metrics_port = os.getenv("METRICS_PORT", "")  # Serve /metrics on this port when set
+# Cache crawled pages on disk when set, at most PAGE_CACHE_MAX_MB. Pages are served without a request
+# for PAGE_CACHE_TTL seconds, then revalidated; the default 0 revalidates on every run.
+page_cache_directory = os.getenv("PAGE_CACHE_DIRECTORY", "")
+page_cache_ttl = os.getenv("PAGE_CACHE_TTL", "0")
+page_cache_max_mb = os.getenv("PAGE_CACHE_MAX_MB", "256")
+
+job_seconds = histogram("scheduler_job_duration_seconds", "Duration of scheduled crawler runs", ["job", "outcome"])
+
+
+class Job:
+    """A crawler run repeated every `interval` seconds"""
+
+    def __init__(self, name: str, run: Callable[[SharedResources], Awaitable[Any]], interval: int):
+        self.name = name
+        self.run = run
+        self.interval = interval
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+
+
+class Scheduler:
+    """Runs every crawler job on one event loop.
+
+    Each job sleeps interval + a random jitter between runs, at most max_concurrent jobs
+    run at the same time and a job never overlaps with its own previous run. A run that
+    failed on a transient error (timeout, dropped connection, 5xx) is retried after a
+    backoff instead. All jobs share one browser and one set of database connections."""
+
+    def __init__(self, jobs: List[Job], resources: SharedResources, max_concurrent: int = 2, jitter: float = 60):
+        self.jobs = jobs
+        self.resources = resources
+        self.jitter = jitter
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run_forever(self):
+        await asyncio.gather(*(self._loop(job) for job in self.jobs))
+
+    async def run_once(self, job: Job):
+        """Run a job now unless its previous run is still going, a failed run raises"""
+        if job.running:
+            print(f"✗ Job {job.name} is still running, skipping this run")
+            return
+        job.running = True
+        outcome = "success"
+        try:
+            async with self.semaphore:
+                print(f"Starting job {job.name}...")
+                started = time.perf_counter()
+                try:
+                    await job.run(self.resources)
+                except Exception:
+                    outcome = "failed"
+                    raise
+                finally:
+                    job_seconds.observe(time.perf_counter() - started, job=job.name, outcome=outcome)
+                job.runs += 1
+                print(f"Job {job.name} completed")
+        except Exception:
+            job.failures += 1
+            raise
+        finally:
+            job.running = False
+
+    async def _loop(self, job: Job):
+        # Spread the first runs so the jobs don't all start together
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        await run_forever(lambda: self.run_once(job), job.interval, f"Job {job.name}", self.jitter)
+
+
+def load_jobs(names: List[str]) -> Dict[str, Any]:
+    """Load the selected jobs, only those need their env variables.
+
+    A name with a config in config_directory is a declarative scraper, any other name
+    is a crawler module. Both expose run, scrape_interval and optionally browser_options."""
+    if "*" in names:
+        names = [name for name in names if name != "*"] + [name for name in config_names(config_directory) if name not in names]
+    jobs: Dict[str, Any] = {}
+    for name in names:
+        path = config_path(config_directory, name)
+        jobs[name] = load_config(path, local=local == "true") if path else importlib.import_module(name)
+    return jobs
+
+
+def merge_browser_options(modules: Dict[str, Any]) -> Optional[BrowserConfig]:
+    """One BrowserConfig with the options of every job that uses the browser"""
+    options: Dict[str, Any] = {}
+    for module in modules.values():
+        if hasattr(module, "browser_options"):
+            options.update(module.browser_options())
+    return BrowserConfig(**options) if options else None
+
+
+async def main():
+    names = [name.strip() for name in job_names.split(",") if name.strip()]
+    if not names:
+        raise ValueError("Please set SCHEDULER_JOBS environment variable.")
+
+    if metrics_port:
+        start_exporter(int(metrics_port))
+
+    modules = load_jobs(names)
+    jobs = [Job(name, module.run, int(module.scrape_interval)) for name, module in modules.items()]
+
+    page_cache = open_page_cache(page_cache_directory, page_cache_ttl, page_cache_max_mb)
+    async with SharedResources(merge_browser_options(modules), local=local == "true", page_cache=page_cache) as resources:
+        scheduler = Scheduler(jobs, resources, max_concurrent=int(max_concurrent_jobs), jitter=float(jitter))
+        print(f"Scheduling {', '.join(f'{job.name} every {job.interval}s' for job in jobs)}")
+        await scheduler.run_forever()
+
+if __name__ == "__main__":
+    asyncio.run(main())